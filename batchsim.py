@@ -0,0 +1,208 @@
+"""Batch NeonRunner episodes as NumPy arrays, for difficulty tuning.
+
+Runs thousands of episodes in lockstep: one array slot per episode for
+the player (y, vy, on_ground), a fixed block of MAX_OBSTACLES obstacle
+slots per episode, and the difficulty state (speed, spawn gap, score).
+Physics, spawning, collision and scoring follow neoncube.World.step(); the
+obstacle rolls use NumPy's generator and skip the course's jumpability
+check, so individual runs differ from the game's and the odd unclearable
+obstacle comes up. A policy decides every frame which episodes jump.
+
+    python batchsim.py --episodes 5000 --policy lookahead
+    python batchsim.py --speed-step 18,12,6 --gap-step 8,4
+
+prints survival and score distributions for each difficulty setting.
+"""
+import argparse
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from course import SPIKE, Difficulty
+from neoncube import FPS_MS, GRAVITY, GROUND_H, HEIGHT, JUMP_V, MAX_OBSTACLES, WIDTH
+
+PLAYER_X, PLAYER_W, PLAYER_H = 120, 36, 36
+GROUND_Y = HEIGHT - GROUND_H - PLAYER_H
+
+
+# ================= BATCH SIMULATION ==================
+class Batch:
+    def __init__(self, episodes, difficulty=Difficulty(), seed=0):
+        n, k = episodes, MAX_OBSTACLES
+        self.n = n
+        self.d = difficulty
+        self.rng = np.random.default_rng(seed)
+
+        self.y = np.full(n, float(GROUND_Y))
+        self.vy = np.zeros(n)
+        self.on_ground = np.ones(n, dtype=bool)
+
+        # obstacle slots; free slots have active False
+        self.ox = np.zeros((n, k))
+        self.ow = np.zeros((n, k))
+        self.oh = np.zeros((n, k))
+        self.speed = np.zeros((n, k))
+        self.typ = np.zeros((n, k), dtype=np.int8)
+        self.active = np.zeros((n, k), dtype=bool)
+        self.counted = np.zeros((n, k), dtype=bool)
+
+        self.base_speed = np.full(n, float(difficulty.base_speed))
+        self.gap = np.full(n, difficulty.gap_base)
+        self.next_spawn = np.zeros(n, dtype=np.int64)     # frame of next spawn
+        self.score = np.zeros(n, dtype=np.int64)
+        self.alive = np.ones(n, dtype=bool)
+        self.frames = np.zeros(n, dtype=np.int64)         # frames survived
+        self.frame = 0
+
+    def step(self, jump):
+        alive = self.alive
+        rng = self.rng
+
+        # jump + gravity
+        start = jump & self.on_ground & alive
+        self.vy[start] = JUMP_V
+        self.vy[alive] += GRAVITY
+        self.y[alive] += self.vy[alive]
+        landed = self.y >= GROUND_Y
+        self.y[landed] = GROUND_Y
+        self.vy[landed] = 0
+        self.on_ground = landed
+
+        # spawn into the first free slot, if any
+        due = alive & (self.next_spawn <= self.frame)
+        free = ~self.active
+        spawn = due & free.any(axis=1)
+        rows = np.flatnonzero(spawn)
+        if rows.size:
+            slots = free[rows].argmax(axis=1)
+            m = rows.size
+            spike = rng.random(m) < 1 / 3
+            h = np.where(spike, rng.integers(40, 91, m), rng.integers(30, 81, m))
+            w = np.where(spike, rng.integers(18, 29, m), rng.integers(28, 61, m))
+            self.ox[rows, slots] = WIDTH + 30
+            self.ow[rows, slots] = w
+            self.oh[rows, slots] = h
+            self.typ[rows, slots] = spike * SPIKE
+            self.speed[rows, slots] = self.base_speed[rows] + rng.random(m) * 1.8
+            self.active[rows, slots] = True
+            self.counted[rows, slots] = False
+        self.next_spawn[due] = self.frame + np.maximum(1, self.gap[due])
+
+        # move, retire off-screen obstacles
+        moving = self.active & alive[:, None]
+        self.ox -= self.speed * moving
+        self.active &= ~(self.ox + self.ow < -50)
+
+        # collision, same inclusive test as the game
+        px1, px2 = PLAYER_X, PLAYER_X + PLAYER_W
+        py1 = self.y[:, None]
+        py2 = py1 + PLAYER_H
+        ey1 = HEIGHT - GROUND_H - self.oh
+        hit = self.active & ~((px2 < self.ox) | (px1 > self.ox + self.ow) |
+                              (py2 < ey1) | (py1 > HEIGHT - GROUND_H))
+        dead = alive & hit.any(axis=1)
+
+        # score and escalation
+        passed = self.active & ~self.counted & (self.ox + self.ow < PLAYER_X) & alive[:, None]
+        self.counted |= passed
+        old = self.score.copy()
+        self.score += passed.sum(axis=1)
+        steps = self.score // self.d.every - old // self.d.every
+        self.base_speed += self.d.speed_step * steps
+        self.gap = np.maximum(self.d.gap_min, self.gap - self.d.gap_step * steps)
+
+        self.alive = alive & ~dead
+        self.frames += self.alive
+        self.frame += 1
+
+    def next_obstacle(self):
+        """Per episode: (distance to the nearest obstacle ahead, its speed, its height).
+
+        Episodes with nothing ahead get distance inf.
+        """
+        ahead = self.active & (self.ox + self.ow >= PLAYER_X)
+        dist = np.where(ahead, self.ox - (PLAYER_X + PLAYER_W), np.inf)
+        i = dist.argmin(axis=1)
+        r = np.arange(self.n)
+        return dist[r, i], self.speed[r, i], self.oh[r, i]
+
+    def run(self, policy, max_frames):
+        while self.frame < max_frames and self.alive.any():
+            self.step(policy(self))
+        return self
+
+
+# ================= POLICIES ==================
+def never(batch):
+    return np.zeros(batch.n, dtype=bool)
+
+
+def random_policy(p=0.03):
+    def policy(batch):
+        return batch.rng.random(batch.n) < p
+    return policy
+
+
+def lookahead(lead=7):
+    """Jump when the next obstacle is `lead` frames from reaching the player."""
+    def policy(batch):
+        dist, speed, _ = batch.next_obstacle()
+        return (dist >= 0) & (dist <= speed * lead)
+    return policy
+
+
+POLICIES = {"never": never, "random": random_policy(), "lookahead": lookahead()}
+
+
+# ================= REPORT ==================
+def summarize(batch):
+    frames, score = batch.frames, batch.score
+    p = np.percentile
+    return {
+        "episodes": batch.n,
+        "survived": round(float(batch.alive.mean()), 3),
+        "seconds_p10": round(float(p(frames, 10)) * FPS_MS / 1000, 1),
+        "seconds_p50": round(float(p(frames, 50)) * FPS_MS / 1000, 1),
+        "seconds_p90": round(float(p(frames, 90)) * FPS_MS / 1000, 1),
+        "score_mean": round(float(score.mean()), 2),
+        "score_p50": int(p(score, 50)),
+        "score_p90": int(p(score, 90)),
+        "score_max": int(score.max()),
+    }
+
+
+def floats(text):
+    return [float(v) for v in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=120, help="episode cap")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--policy", choices=POLICIES, default="lookahead")
+    parser.add_argument("--speed-step", type=floats, default=[Difficulty().speed_step])
+    parser.add_argument("--gap-step", type=floats, default=[Difficulty().gap_step])
+    parser.add_argument("--gap-min", type=floats, default=[Difficulty().gap_min])
+    args = parser.parse_args(argv)
+
+    max_frames = int(args.seconds * 1000 / FPS_MS)
+    cols = ("speed_step", "gap_step", "gap_min", "survived", "seconds_p10", "seconds_p50",
+            "seconds_p90", "score_mean", "score_p50", "score_p90", "score_max", "wall_s")
+    print("  ".join(f"{c:>11}" for c in cols))
+
+    for speed_step, gap_step, gap_min in itertools.product(
+            args.speed_step, args.gap_step, args.gap_min):
+        d = Difficulty(speed_step=speed_step, gap_step=int(gap_step), gap_min=int(gap_min))
+        t0 = time.perf_counter()
+        batch = Batch(args.episodes, d, args.seed).run(POLICIES[args.policy], max_frames)
+        row = {"speed_step": speed_step, "gap_step": gap_step, "gap_min": gap_min,
+               **summarize(batch), "wall_s": round(time.perf_counter() - t0, 2)}
+        print("  ".join(f"{row[c]:>11}" for c in cols))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
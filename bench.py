@@ -0,0 +1,409 @@
+"""Headless benchmarks for spaceshoot and neoncube.
+
+Both games run against FakeCanvas, a recording stand-in for tk.Canvas,
+so no display is needed. Each scenario drives the game's own
+FixedStepLoop one 16 ms step per tick on a virtual clock and reports
+frames/sec, canvas (Tcl) calls per frame and Python allocations.
+
+    python bench.py                      # all scenarios
+    python bench.py storm --frames 2000
+    python bench.py --baseline bench_results.jsonl
+    python bench.py --render image       # composited single-image backend
+
+Results are appended to --out as JSON lines; --baseline compares this
+run against the last record of each scenario in an earlier file.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+
+# ================= FAKE TK ==================
+class FakeCanvas:
+    """Records every call; keeps just enough item state to answer queries."""
+
+    def __init__(self, *args, **options):
+        self.items = {}
+        self.next_id = 1
+        self.calls = Counter()
+
+    def pack(self, *args, **options):
+        pass
+
+    # ---- helpers
+    def _ids(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        if tag_or_id == "all":
+            return list(self.items)
+        return [i for i, it in self.items.items() if tag_or_id in it["tags"]]
+
+    def _create(self, kind, args, options):
+        self.calls["create_" + kind] += 1
+        coords = list(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else list(args)
+        tags = options.get("tags", options.get("tag", ()))
+        if isinstance(tags, str):
+            tags = (tags,)
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = {"kind": kind, "coords": coords,
+                            "options": options, "tags": set(tags)}
+        return item
+
+    # ---- item creation
+    def create_rectangle(self, *args, **options):
+        return self._create("rectangle", args, options)
+
+    def create_oval(self, *args, **options):
+        return self._create("oval", args, options)
+
+    def create_polygon(self, *args, **options):
+        return self._create("polygon", args, options)
+
+    def create_line(self, *args, **options):
+        return self._create("line", args, options)
+
+    def create_text(self, *args, **options):
+        return self._create("text", args, options)
+
+    def create_image(self, *args, **options):
+        return self._create("image", args, options)
+
+    # ---- item access
+    def coords(self, tag_or_id, *args):
+        self.calls["coords"] += 1
+        ids = self._ids(tag_or_id)
+        if not args:
+            return list(self.items[ids[0]]["coords"]) if ids else []
+        coords = list(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else list(args)
+        for i in ids[:1]:
+            self.items[i]["coords"] = coords
+
+    def move(self, tag_or_id, dx, dy):
+        self.calls["move"] += 1
+        for i in self._ids(tag_or_id):
+            c = self.items[i]["coords"]
+            for j in range(0, len(c) - 1, 2):
+                c[j] += dx
+                c[j + 1] += dy
+
+    def bbox(self, tag_or_id):
+        self.calls["bbox"] += 1
+        xs, ys = [], []
+        for i in self._ids(tag_or_id):
+            c = self.items[i]["coords"]
+            xs += c[0::2]
+            ys += c[1::2]
+        if not xs:
+            return None
+        return int(min(xs)), int(min(ys)), int(max(xs)) + 1, int(max(ys)) + 1
+
+    def delete(self, *tags_or_ids):
+        self.calls["delete"] += 1
+        for t in tags_or_ids:
+            for i in self._ids(t):
+                del self.items[i]
+
+    def itemconfig(self, tag_or_id, **options):
+        self.calls["itemconfig"] += 1
+        for i in self._ids(tag_or_id):
+            self.items[i]["options"].update(options)
+
+    itemconfigure = itemconfig
+
+    def find_all(self):
+        self.calls["find_all"] += 1
+        return tuple(self.items)
+
+    def tag_raise(self, *args):
+        self.calls["tag_raise"] += 1
+
+    def tag_lower(self, *args):
+        self.calls["tag_lower"] += 1
+
+
+class FakeImage:
+    """Stand-in for tk.PhotoImage; image calls are counted with the canvas's."""
+
+    def __init__(self, width, height, calls=None):
+        self._width = width
+        self._height = height
+        self.calls = Counter() if calls is None else calls
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def put(self, data, to=None):
+        self.calls["image_put"] += 1
+
+    def blank(self):
+        self.calls["image_blank"] += 1
+
+
+class FakeRoot:
+    """Enough of tk.Tk for the games' constructors; after() never fires."""
+
+    def __init__(self):
+        self.t = 0.0
+        self.pending = 0
+
+    def clock(self):
+        return self.t
+
+    def title(self, *args):
+        pass
+
+    def resizable(self, *args):
+        pass
+
+    def bind(self, *args):
+        pass
+
+    def after(self, ms, func=None, *args):
+        self.pending += 1
+        return f"after#{self.pending}"
+
+    def after_cancel(self, after_id):
+        pass
+
+    def mainloop(self):
+        pass
+
+
+# ================= DRIVERS ==================
+def attach(loop, root):
+    loop.clock = root.clock
+    loop.last = root.clock()
+    loop.accumulator = 0
+
+
+def spaceshoot_game(seed, render="canvas"):
+    import spaceshoot
+
+    random.seed(seed)
+    root, canvas = FakeRoot(), FakeCanvas()
+    game = spaceshoot.Game(root, canvas, seed=seed, render=render, sprite_dir=None,
+                           images=lambda w, h: FakeImage(w, h, canvas.calls))
+    attach(game.loop, root)
+    return game, root, canvas
+
+
+def neoncube_game(seed, render="canvas", **settings):
+    import neoncube
+    from scores import ScoreStore
+
+    random.seed(seed)
+    root, canvas = FakeRoot(), FakeCanvas()
+    game = neoncube.NeonRunner(root, canvas, seed=seed, render=render, scores=ScoreStore(),
+                               sprite_dir=None,
+                               images=lambda w, h: FakeImage(w, h, canvas.calls))
+    for name, value in settings.items():
+        setattr(game.world, name, value)
+    game.start()
+    attach(game.loop, root)
+    return game, root, canvas
+
+
+# ================= SCENARIOS ==================
+def bullets_x_enemies(n_bullets=60, n_enemies=40):
+    import spaceshoot as ss
+
+    def feed(game, frame):
+        w = game.world
+        for e in list(w.enemies):
+            if e.y >= ss.HEIGHT - 100:
+                w.enemies.remove(e.handle)
+        while len(w.enemies) < n_enemies:
+            w.enemies.add(ss.Enemy(random.randint(40, ss.WIDTH - 40),
+                                   random.randint(-20, 300)))
+        while len(w.bullets) < n_bullets:
+            w.bullets.add(ss.Bullet(random.randint(10, ss.WIDTH - 10),
+                                    random.randint(300, ss.HEIGHT - 40)))
+        w.boss = None
+        w.score = 0
+
+    return spaceshoot_game, feed
+
+
+def explosion_storm(per_frame=4):
+    import spaceshoot as ss
+
+    def feed(game, frame):
+        w = game.world
+        for _ in range(per_frame):
+            w.explode(random.randint(0, ss.WIDTH), random.randint(0, ss.HEIGHT))
+        w.enemies.clear()
+
+    return spaceshoot_game, feed
+
+
+def max_speed_runner(escalations=6, obstacle_cap=None, spawn_gap=None):
+    from course import Difficulty
+    from neoncube import MAX_OBSTACLES, OBSTACLE_GAP_BASE
+
+    # invulnerable runner held at the speed reached after N escalations;
+    # the course is rolled up front, so the settings go in before start()
+    gap = spawn_gap or OBSTACLE_GAP_BASE
+    settings = {
+        "difficulty": Difficulty(base_speed=6 + 18 * escalations, speed_step=0,
+                                 gap_base=gap, gap_min=min(gap, 80)),
+        "max_obstacles": obstacle_cap or MAX_OBSTACLES,
+        "jumpable": False,
+    }
+
+    def make(seed, render="canvas"):
+        return neoncube_game(seed, render, **settings)
+
+    def feed(game, frame):
+        w = game.world
+        w.end = lambda: None
+        if w.player.on_ground and frame % 20 == 0:
+            w.player.jump()
+
+    return make, feed
+
+
+def crowded_runner():
+    return max_speed_runner(escalations=0, obstacle_cap=60, spawn_gap=3)
+
+
+SCENARIOS = {
+    "bullets_x_enemies": bullets_x_enemies,
+    "storm": explosion_storm,
+    "runner": max_speed_runner,
+    "crowd": crowded_runner,
+}
+
+
+def run_frames(game, root, feed, frames, step_ms=16):
+    for frame in range(frames):
+        feed(game, frame)
+        root.t += step_ms / 1000
+        game.loop.tick()
+
+
+def run_scenario(name, frames=600, seed=1, render="canvas"):
+    make, feed = SCENARIOS[name]()
+
+    # timing pass
+    game, root, canvas = make(seed, render)
+    run_frames(game, root, feed, 30)
+    canvas.calls.clear()
+    game.profiler.frames.clear()
+
+    t0 = time.perf_counter()
+    run_frames(game, root, feed, frames)
+    wall = time.perf_counter() - t0
+    summary = game.profiler.summary()
+    loop = game.loop.stats()   # counts the warm-up frames too
+    sprites = game.sprites.stats()
+    calls = dict(canvas.calls)
+    created = sum(v for k, v in calls.items() if k.startswith("create_"))
+
+    # allocation pass (tracemalloc is too slow to time under)
+    game, root, canvas = make(seed, render)
+    run_frames(game, root, feed, 30)
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    run_frames(game, root, feed, min(frames, 200))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "scenario": name,
+        "render": render,
+        "frames": frames,
+        "seed": seed,
+        "fps": round(frames / wall, 1),
+        "frame_p50_ms": summary["frame_p50"],
+        "frame_p99_ms": summary["frame_p99"],
+        "tcl_calls_per_frame": round(sum(calls.values()) / frames, 2),
+        "calls": {k: round(v / frames, 2) for k, v in sorted(calls.items())},
+        "items_created_per_frame": round(created / frames, 3),
+        "alloc_peak_kb": round((peak - base) / 1024, 1),
+        "alloc_net_kb": round((current - base) / 1024, 1),
+        "loop": loop,
+        "sprites": sprites,
+    }
+
+
+# ================= RESULTS ==================
+def load_results(path):
+    latest = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                latest[rec["scenario"], rec.get("render", "canvas")] = rec
+    return latest
+
+
+def compare(result, base, threshold):
+    """Lines describing regressions of `result` against `base`."""
+    out = []
+    if result["fps"] < base["fps"] * (1 - threshold):
+        out.append(f"fps {base['fps']} -> {result['fps']}")
+    if result["tcl_calls_per_frame"] > base["tcl_calls_per_frame"] * (1 + threshold):
+        out.append(f"tcl calls/frame {base['tcl_calls_per_frame']} -> "
+                   f"{result['tcl_calls_per_frame']}")
+    if result["items_created_per_frame"] > base["items_created_per_frame"] * (1 + threshold) + 0.01:
+        out.append(f"items created/frame {base['items_created_per_frame']} -> "
+                   f"{result['items_created_per_frame']}")
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--render", choices=("canvas", "image"), default="canvas",
+                        help="render backend to draw through (default canvas)")
+    parser.add_argument("--out", default="bench_results.jsonl")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed relative regression (default 0.15)")
+    args = parser.parse_args(argv)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+
+    baseline = load_results(args.baseline) if args.baseline else {}
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    regressions = 0
+
+    with open(args.out, "a") as out:
+        for name in args.scenarios or SCENARIOS:
+            result = run_scenario(name, args.frames, args.seed, args.render)
+            result["time"] = stamp
+            result["python"] = platform.python_version()
+            out.write(json.dumps(result) + "\n")
+
+            print(f"{name:<18} {result['fps']:>9.1f} fps  "
+                  f"p99 {result['frame_p99_ms']:6.3f} ms  "
+                  f"{result['tcl_calls_per_frame']:8.1f} calls/frame  "
+                  f"{result['items_created_per_frame']:6.3f} creates/frame  "
+                  f"peak {result['alloc_peak_kb']:.1f} KB  "
+                  f"dropped {result['loop']['dropped_ms']:.0f} ms  "
+                  f"sprites {result['sprites']['misses']} rendered "
+                  f"{result['sprites']['evictions']} evicted")
+
+            if (name, args.render) in baseline:
+                for line in compare(result, baseline[name, args.render], args.threshold):
+                    print(f"  REGRESSION {line}")
+                    regressions += 1
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
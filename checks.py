@@ -0,0 +1,232 @@
+"""Self-checks for the invariants the hot paths rely on.
+
+The optimized structures trade obvious code for speed. Each check here
+drives one of them and compares it with the plain behaviour it replaces:
+
+    python checks.py              # every check
+    python checks.py entities     # only the named ones
+
+A failing check prints what went wrong; the exit status is the number of
+failed checks.
+"""
+import random
+import sys
+import time
+import traceback
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def expect(ok, message):
+    if not ok:
+        raise CheckFailed(message)
+
+
+# ================= ENTITY STORE ==================
+def check_entities():
+    """Generational handles and swap-removal against a dict of live entities."""
+    from entities import EntityStore
+
+    class Thing:
+        def __init__(self, n):
+            self.n = n
+
+    store = EntityStore()
+    a, b, c = Thing(0), Thing(1), Thing(2)
+    for thing in (a, b, c):
+        store.add(thing)
+
+    stale = b.handle
+    expect(store.remove(stale), "removing a live handle failed")
+    expect(store.items == [a, c], f"c not swapped into b's place: {store.items}")
+    expect(store.get(c.handle) is c, "moved entity lost its handle")
+    expect(not store.remove(stale), "stale handle removed twice")
+
+    d = Thing(3)
+    store.add(d)      # reuses b's slot with the next generation
+    expect(d.handle != stale, "reused slot kept the old generation")
+    expect(not store.alive(stale) and store.get(stale) is None,
+           "stale handle reaches the slot's new entity")
+    expect(not store.remove(stale) and store.get(d.handle) is d,
+           "stale handle removed the slot's new entity")
+
+    # removing while walking backwards visits every entity exactly once
+    store = EntityStore()
+    things = [Thing(n) for n in range(200)]
+    for thing in things:
+        store.add(thing)
+    seen = []
+    for i in range(len(store) - 1, -1, -1):
+        thing = store.items[i]
+        seen.append(thing.n)
+        if thing.n % 3 == 0:
+            store.remove(thing.handle)
+    expect(sorted(seen) == list(range(200)), "backwards walk skipped or repeated entities")
+    expect(sorted(t.n for t in store) == [n for n in range(200) if n % 3],
+           "wrong entities left after removal")
+
+    # random adds and removes against a plain dict
+    rng = random.Random(1)
+    store, live, handles = EntityStore(), {}, []
+    for step in range(20000):
+        if live and rng.random() < 0.45:
+            handle = rng.choice(handles)
+            removed = store.remove(handle)
+            expect(removed == (handle in live), f"step {step}: remove() = {removed}")
+            live.pop(handle, None)
+        else:
+            thing = Thing(step)
+            handle = store.add(thing)
+            expect(handle not in live, f"step {step}: handle {handle} handed out twice")
+            live[handle] = thing
+            handles.append(handle)
+        if step % 500 == 0:
+            for handle in handles:
+                expect(store.get(handle) is live.get(handle),
+                       f"step {step}: get({handle}) disagrees")
+            expect(len(store) == len(live), f"step {step}: {len(store)} != {len(live)}")
+
+
+# ================= SCHEDULER ==================
+def check_timers():
+    """Firing order, `now` inside callbacks, re-arming, cancel and pause."""
+    from timers import Scheduler
+
+    timers = Scheduler()
+    fired = []
+
+    def note(name):
+        fired.append((name, timers.now))
+
+    for delay, name in ((30, "a"), (10, "b"), (20, "c"), (10, "d"), (50, "late")):
+        timers.after(delay, note, name)
+    timers.advance(16)
+    expect(fired == [("b", 10), ("d", 10)], f"first advance fired {fired}")
+    expect(timers.now == 16, f"now is {timers.now} after advance(16)")
+    fired.clear()
+    timers.advance(16)
+    expect(fired == [("c", 20), ("a", 30)], f"several due in one advance fired {fired}")
+
+    # a self-re-arming timer keeps its period however coarse the steps
+    timers = Scheduler()
+    ticks = []
+
+    def tick():
+        ticks.append(timers.now)
+        timers.after(16, tick)
+    timers.after(16, tick)
+    timers.advance(100)
+    expect(ticks == [16, 32, 48, 64, 80, 96], f"re-armed timer fired at {ticks}")
+    timers.advance(1)
+    timers.advance(20)
+    expect(ticks[6:] == [112], f"re-armed timer after small steps fired at {ticks[6:]}")
+
+    # a timer armed for 0 ms from a callback fires in the same advance,
+    # after the others due at that time
+    timers = Scheduler()
+    fired = []
+
+    def first():
+        fired.append("first")
+        timers.after(0, fired.append, "armed")
+    timers.after(5, first)
+    timers.after(5, fired.append, "second")
+    timers.advance(5)
+    expect(fired == ["first", "second", "armed"], f"zero-delay re-arm fired {fired}")
+
+    # cancelled timers are skipped; a paused clock doesn't move
+    timers = Scheduler()
+    fired = []
+    keep = timers.after(10, fired.append, "keep")
+    drop = timers.after(10, fired.append, "drop")
+    timers.cancel(drop)
+    expect(len(timers) == 1, f"{len(timers)} timers pending after cancel")
+    timers.pause()
+    timers.advance(50)
+    expect(fired == [] and timers.now == 0, "paused scheduler advanced")
+    expect(timers.remaining(keep) == 10, f"remaining {timers.remaining(keep)} while paused")
+    timers.resume()
+    timers.advance(10)
+    expect(fired == ["keep"], f"cancel/resume fired {fired}")
+
+
+# ================= COURSE ==================
+def check_course(trials=300):
+    """The course's collision model against the game, on unchecked courses.
+
+    Random jumps through `trials` seeded runs: the model's jump states and
+    obstacle windows must predict the frame of the first collision exactly.
+    """
+    import neoncube as nc
+
+    for trial in range(trials):
+        world = nc.World()
+        if trial % 2:
+            world.difficulty = nc.Difficulty(gap_base=40, gap_min=40)   # crowded
+        world.jumpable = False
+        world.start(trial)
+        course = world.course
+        rng = random.Random(trial)
+
+        state = 0           # 0 on the ground, k airborne frame k - 1
+        seen, windows = set(), []
+        predicted = None
+        while predicted is None and world.running and world.frame < 2000:
+            jump = rng.random() < 0.08
+            if state == 0:
+                state = 1 if jump else 0
+            elif state == course.top:
+                state = 0
+            else:
+                state += 1
+            world.step(nc.JUMP_BIT if jump else 0)
+
+            f = world.frame
+            for ob in world.obstacles:
+                if ob.key not in seen:
+                    seen.add(ob.key)
+                    windows.append(course.path(f, ob.w, ob.h, ob.speed)[0])
+            bit = 1 << state
+            if any(first <= f <= last and unsafe & bit for first, last, unsafe in windows):
+                predicted = f
+
+        hit = world.frame if world.over else None
+        expect(hit == predicted,
+               f"seed {trial}: game collided on frame {hit}, model predicts {predicted}")
+
+
+CHECKS = {
+    "entities": check_entities,
+    "timers": check_timers,
+    "course": check_course,
+}
+
+
+def main(argv=None):
+    names = (sys.argv[1:] if argv is None else argv) or list(CHECKS)
+    for name in names:
+        if name not in CHECKS:
+            print(f"unknown check {name!r}; choose from: {', '.join(CHECKS)}")
+            return 2
+
+    failed = 0
+    for name in names:
+        t0 = time.perf_counter()
+        try:
+            CHECKS[name]()
+        except CheckFailed as e:
+            print(f"{name}: FAILED: {e}")
+            failed += 1
+        except Exception:
+            print(f"{name}: ERROR")
+            traceback.print_exc()
+            failed += 1
+        else:
+            print(f"{name}: ok ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(main())
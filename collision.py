@@ -0,0 +1,136 @@
+import math
+from bisect import bisect_left
+from operator import attrgetter
+
+
+# ================= SPATIAL HASH ==================
+class SpatialHash:
+    """Uniform grid broad phase, rebuilt each frame from model boxes.
+
+    Objects are bucketed by the cells their box overlaps; a query only
+    looks at the cells under the query box, so the number of candidates
+    follows the number of nearby pairs instead of every pair.
+    """
+
+    def __init__(self, cell=64):
+        self.cell = cell
+        self.cells = {}
+        self.count = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+    def insert(self, obj, x1, y1, x2, y2):
+        cs = self.cell
+        entry = (self.count, obj)
+        self.count += 1
+        for cx in range(math.floor(x1 / cs), math.floor(x2 / cs) + 1):
+            for cy in range(math.floor(y1 / cs), math.floor(y2 / cs) + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is None:
+                    self.cells[(cx, cy)] = [entry]
+                else:
+                    bucket.append(entry)
+
+    def query(self, x1, y1, x2, y2):
+        """Objects whose cells touch the box, in insertion order."""
+        cs = self.cell
+        found = {}
+        for cx in range(math.floor(x1 / cs), math.floor(x2 / cs) + 1):
+            for cy in range(math.floor(y1 / cs), math.floor(y2 / cs) + 1):
+                for i, obj in self.cells.get((cx, cy), ()):
+                    found[i] = obj
+        return [found[i] for i in sorted(found)]
+
+
+# ================= SWEEP AND PRUNE ==================
+def sweep(items, x1, x2, max_w, key=attrgetter("x")):
+    """Items whose x-span can overlap [x1, x2].
+
+    `items` must be sorted by left edge and no item may be wider than
+    max_w, so a bisect finds the first candidate and the scan stops at
+    the first item starting right of x2.
+    """
+    i = bisect_left(items, x1 - max_w, key=key)
+    n = len(items)
+    while i < n:
+        item = items[i]
+        if key(item) > x2:
+            break
+        yield item
+        i += 1
+
+
+# ================= BIT MASKS ==================
+class BitMask:
+    """A shape rasterized once into one int per pixel row.
+
+    Bit i of rows[y] is pixel (i, y), relative to the mask's top-left.
+    Two masks overlap if any pair of rows ANDs nonzero once one row is
+    shifted by the horizontal offset between them, so an exact test is
+    a few int operations per shared row.
+    """
+    __slots__ = ("w", "h", "rows")
+
+    def __init__(self, w, h, rows):
+        self.w = w
+        self.h = h
+        self.rows = rows
+
+    def overlaps(self, x, y, other, ox, oy):
+        """Does this mask at (x, y) touch `other` at (ox, oy)?"""
+        dx, dy = ox - x, oy - y
+        rows, orows = self.rows, other.rows
+        for row in range(max(0, dy), min(self.h, dy + other.h)):
+            r = rows[row] >> dx if dx >= 0 else rows[row] << -dx
+            if r & orows[row - dy]:
+                return True
+        return False
+
+
+_masks = {}
+
+
+def rect_mask(w, h):
+    key = ("rect", w, h)
+    mask = _masks.get(key)
+    if mask is None:
+        mask = _masks[key] = BitMask(w, h, ((1 << w) - 1,) * h)
+    return mask
+
+
+def polygon_mask(points):
+    """Mask of the pixels whose centers are inside `points` (even-odd).
+
+    Points are relative to the mask's top-left and should not be negative.
+    """
+    points = tuple(points)
+    key = ("polygon", points)
+    mask = _masks.get(key)
+    if mask is None:
+        w = math.ceil(max(x for x, _ in points))
+        h = math.ceil(max(y for _, y in points))
+        edges = list(zip(points, points[1:] + points[:1]))
+        rows = []
+        for row in range(h):
+            cy = row + 0.5
+            bits = 0
+            for col in range(w):
+                cx = col + 0.5
+                inside = False
+                for (x0, y0), (x1, y1) in edges:
+                    if (y0 > cy) != (y1 > cy) and cx < x0 + (cy - y0) * (x1 - x0) / (y1 - y0):
+                        inside = not inside
+                if inside:
+                    bits |= 1 << col
+            rows.append(bits)
+        mask = _masks[key] = BitMask(w, h, tuple(rows))
+    return mask
+
+
+def mask_hit(a, b):
+    """Exact test between two objects with a `mask` and an origin()."""
+    ax, ay = a.origin()
+    bx, by = b.origin()
+    return a.mask.overlaps(ax, ay, b.mask, bx, by)
@@ -0,0 +1,200 @@
+"""NeonRunner obstacle courses, generated ahead of the game loop.
+
+A Course rolls obstacles from its own seeded stream in chunks of
+`chunk`. Each chunk is a compact NumPy record array with one row per
+obstacle: the frame it spawns on, its width, height, type and speed.
+The game loop only takes the next row when its frame comes up.
+
+The generator plays the run forward itself. It uses the same spawn
+schedule, obstacle cap, float motion and score-driven escalation as the
+game, and assumes the player survives, because otherwise nothing else
+is spawned. It also tracks the set of jump states the player could be in
+on every frame: on the ground, or k frames into a jump. Obstacles under
+the player remove the states that would touch them. A rolled obstacle
+that would leave that set empty before every obstacle on screen has
+passed cannot be cleared by any sequence of jumps. Such a roll is
+rejected and rolled again. After `tries` failed rolls the spawn is
+skipped, which is always survivable. With checked=False every roll is
+kept (for runs where the player cannot die).
+"""
+import random
+from typing import NamedTuple
+
+import numpy as np
+
+BLOCK, SPIKE = 0, 1
+TYPES = ("block", "spike")
+
+ROW = np.dtype([("frame", np.int64), ("w", np.int16), ("h", np.int16),
+                ("typ", np.int8), ("speed", np.float64)])
+
+
+class Difficulty(NamedTuple):
+    base_speed: float = 6
+    speed_step: float = 18      # added every `every` points
+    gap_base: int = 140         # frames between spawn attempts
+    gap_step: int = 8
+    gap_min: int = 80
+    every: int = 5
+
+
+# ================= COURSE ==================
+class Course:
+    """Seeded, pre-checked obstacle rows for one run.
+
+    `spawn_x` is where obstacles appear, `ground` the y of the ground
+    line, `player` the runner's (x, w, h); `jump_v` and `gravity` give
+    its jump arc, stepped exactly as Player.apply_gravity() does.
+    """
+
+    def __init__(self, seed, difficulty=Difficulty(), max_obstacles=6, *,
+                 spawn_x, ground, player, jump_v, gravity, checked=True,
+                 chunk=32, tries=20):
+        self.rng = random.Random(seed)
+        self.d = difficulty
+        self.max_obstacles = max_obstacles
+        self.spawn_x = spawn_x
+        self.ground = ground
+        self.px, self.pw, self.ph = player
+        self.checked = checked
+        self.chunk = chunk
+        self.tries = tries
+
+        # y of the player on each airborne frame of a jump
+        y = ground - self.ph
+        vy = jump_v
+        self.air = []
+        while True:
+            vy += gravity
+            y += vy
+            if y + self.ph >= ground:
+                break
+            self.air.append(y)
+        # state bits: bit 0 on the ground, bit k+1 airborne frame k
+        self.top = len(self.air)
+        self.full = (1 << (self.top + 1)) - 1
+        self.unsafe_cache = {}
+
+        self.attempt = 1                # frame of the next spawn attempt
+        self.reach = 1                  # states possible at the end of attempt - 1
+        self.reach_frame = 0
+        self.live = []                  # gone frame of each obstacle on screen
+        self.passes = []                # frames obstacles will be scored on
+        self.score = 0                  # points before the next attempt
+        self.windows = []               # (first, last, unsafe) while over the player
+
+        self.rows = np.empty(0, ROW)
+        self.i = 0
+        self.rejected = 0
+        self.skipped = 0
+
+    # ---- consuming
+    def peek(self):
+        """The next row as (frame, w, h, typ, speed); generates a chunk if needed."""
+        if self.i == len(self.rows):
+            self.rows = self.generate(self.chunk)
+            self.i = 0
+        frame, w, h, typ, speed = self.rows[self.i].item()
+        return frame, w, h, typ, speed
+
+    def pop(self):
+        row = self.peek()
+        self.i += 1
+        return row
+
+    # ---- generation
+    def generate(self, n):
+        rows = []
+        while len(rows) < n:
+            f = self.attempt
+            self.score += sum(p < f for p in self.passes)
+            self.passes = [p for p in self.passes if p >= f]
+            level = self.score // self.d.every
+            speed = self.d.base_speed + self.d.speed_step * level
+            gap = max(self.d.gap_min, self.d.gap_base - self.d.gap_step * level)
+
+            self.live = [g for g in self.live if g >= f]
+            if len(self.live) < self.max_obstacles:
+                row = self.roll(f, speed)
+                if row is not None:
+                    rows.append(row)
+
+            self.attempt = f + max(1, int(gap))
+            if not self.checked:
+                continue
+            self.reach = self.advance(self.reach, self.reach_frame, self.attempt - 1)
+            self.reach_frame = self.attempt - 1
+            self.windows = [w for w in self.windows if w[1] > self.reach_frame]
+        return np.array(rows, ROW)
+
+    def roll(self, f, base_speed):
+        rng = self.rng
+        for _ in range(self.tries):
+            typ = rng.choice((BLOCK, BLOCK, SPIKE))
+            h = rng.randint(30, 80) if typ == BLOCK else rng.randint(40, 90)
+            w = rng.randint(28, 60) if typ == BLOCK else rng.randint(18, 28)
+            speed = base_speed + rng.random()*1.8
+
+            window, passed, gone = self.path(f, w, h, speed)
+            if self.checked:
+                self.windows.append(window)
+                end = max(last for _, last, _ in self.windows)
+                if not self.advance(self.reach, self.reach_frame, end):
+                    self.windows.pop()
+                    self.rejected += 1
+                    continue
+            self.live.append(gone)
+            if passed is not None:
+                self.passes.append(passed)
+            return f, w, h, typ, speed
+        self.skipped += 1
+        return None
+
+    def path(self, f, w, h, speed):
+        """Frames over the player, the frame it is scored (or None) and removed.
+
+        x moves by repeated subtraction, exactly like Obstacle.update().
+        """
+        px1, px2 = self.px, self.px + self.pw
+        x = self.spawn_x
+        frame = f
+        first = passed = None
+        last = f - 1        # first > last if it skips past the player in one move
+        while True:
+            x -= speed
+            if first is None and x <= px2:
+                first = frame
+            if x + w >= px1:
+                last = frame
+            elif passed is None:
+                passed = frame
+            if x + w < -50:
+                # removed before scoring if it passed and left in one move
+                if passed == frame:
+                    passed = None
+                return (first, last, self.unsafe(h)), passed, frame
+            frame += 1
+
+    def unsafe(self, h):
+        """States whose box touches an obstacle of height h under the player."""
+        mask = self.unsafe_cache.get(h)
+        if mask is None:
+            mask = 1        # on the ground
+            for k, y in enumerate(self.air):
+                if y + self.ph >= self.ground - h:
+                    mask |= 1 << (k + 1)
+            self.unsafe_cache[h] = mask
+        return mask
+
+    def advance(self, reach, start, end):
+        """Possible states after frames start+1..end; 0 if none survive."""
+        top, full, windows = self.top, self.full, self.windows
+        for frame in range(start + 1, end + 1):
+            # stay down or jump from the ground; airborne states move on or land
+            reach = ((reach << 1) | (reach & 1) | ((reach >> top) & 1)) & full
+            for first, last, unsafe in windows:
+                if first <= frame <= last:
+                    reach &= ~unsafe
+            if not reach:
+                return 0
+        return reach
@@ -0,0 +1,79 @@
+GEN_SHIFT = 24
+SLOT_MASK = (1 << GEN_SHIFT) - 1
+
+
+# ================= ENTITY STORE ==================
+class EntityStore:
+    """Dense entity list with O(1) add/remove and generational handles.
+
+    Live entities are packed in `items`; remove() moves the last entity
+    into the hole, so order is not preserved. Each entity gets a handle
+    (slot | generation << GEN_SHIFT) stored on `entity.handle`. Removing
+    bumps the slot's generation, so a stale handle - e.g. a bullet that
+    already hit something this frame - is simply ignored.
+
+    To remove while iterating, walk `items` backwards by index: the
+    entity swapped into the hole has then already been visited.
+    """
+
+    def __init__(self):
+        self.items = []     # dense entities
+        self.handles = []   # handle of items[i]
+        self.index = []     # slot -> dense index, -1 when free
+        self.gens = []      # slot -> current generation
+        self.free = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, entity):
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = len(self.index)
+            self.index.append(-1)
+            self.gens.append(0)
+
+        handle = slot | (self.gens[slot] << GEN_SHIFT)
+        self.index[slot] = len(self.items)
+        self.items.append(entity)
+        self.handles.append(handle)
+        entity.handle = handle
+        return handle
+
+    def alive(self, handle):
+        slot = handle & SLOT_MASK
+        return slot < len(self.gens) and self.gens[slot] == handle >> GEN_SHIFT \
+            and self.index[slot] >= 0
+
+    def get(self, handle):
+        if self.alive(handle):
+            return self.items[self.index[handle & SLOT_MASK]]
+        return None
+
+    def remove(self, handle):
+        if not self.alive(handle):
+            return False
+
+        slot = handle & SLOT_MASK
+        i = self.index[slot]
+        last = len(self.items) - 1
+        if i != last:
+            moved = self.handles[last]
+            self.items[i] = self.items[last]
+            self.handles[i] = moved
+            self.index[moved & SLOT_MASK] = i
+        self.items.pop()
+        self.handles.pop()
+
+        self.index[slot] = -1
+        self.gens[slot] += 1
+        self.free.append(slot)
+        return True
+
+    def clear(self):
+        for handle in list(self.handles):
+            self.remove(handle)
@@ -0,0 +1,110 @@
+import time
+from collections import deque
+
+
+# ================= FIXED TIMESTEP LOOP ==================
+class FixedStepLoop:
+    """Runs step() at a fixed rate off the real clock, render() once per tick.
+
+    Elapsed wall time is banked in an accumulator and spent in whole
+    steps of step_ms, so gameplay speed no longer depends on how often
+    Tk gets round to calling us. At most max_steps are run per tick; any
+    time beyond that is dropped rather than replayed later. render() gets
+    alpha in [0, 1), how far the clock is between the last two steps.
+    If a FrameProfiler is given, each tick is recorded as one frame.
+    work_ms is how long the last tick itself took, idle time excluded.
+    """
+
+    def __init__(self, root, step, render, step_ms=16, max_steps=5,
+                 clock=time.perf_counter, history=240, profiler=None):
+        self.root = root
+        self.step = step
+        self.render = render
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.clock = clock
+        self.profiler = profiler
+
+        self.running = False
+        self.last = 0
+        self.accumulator = 0
+        self.after_id = None
+
+        # pacing
+        self.frame_times = deque(maxlen=history)
+        self.work_ms = 0
+        self.frames = 0
+        self.steps = 0
+        self.dropped_ms = 0
+
+    def start(self):
+        self.running = True
+        self.last = self.clock()
+        self.accumulator = self.step_ms
+        self.tick()
+
+    def stop(self):
+        self.running = False
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def tick(self):
+        self.after_id = None
+        prof = self.profiler
+        if prof:
+            prof.begin()
+
+        now = self.clock()
+        elapsed = (now - self.last) * 1000
+        self.last = now
+
+        self.frames += 1
+        self.frame_times.append(elapsed)
+        self.accumulator += elapsed
+
+        steps = 0
+        while self.accumulator >= self.step_ms and steps < self.max_steps:
+            self.step()
+            self.accumulator -= self.step_ms
+            self.steps += 1
+            steps += 1
+            if not self.running:
+                break
+
+        if self.accumulator >= self.step_ms:
+            # too far behind: drop the backlog instead of spiralling
+            self.dropped_ms += self.accumulator - self.accumulator % self.step_ms
+            self.accumulator %= self.step_ms
+
+        self.render(self.accumulator / self.step_ms)
+
+        if prof:
+            prof.count("n_steps", steps)
+            prof.end()
+        self.work_ms = (self.clock() - now) * 1000
+
+        if self.running:
+            delay = max(1, int(self.step_ms - self.accumulator))
+            self.after_id = self.root.after(delay, self.tick)
+
+    def fps(self):
+        times = self.frame_times
+        avg = sum(times) / len(times) if times else 0
+        return 1000 / avg if avg else 0
+
+    def stats(self):
+        times = self.frame_times
+        avg = sum(times) / len(times) if times else 0
+        return {
+            "frames": self.frames,
+            "steps": self.steps,
+            "dropped_ms": round(self.dropped_ms, 1),
+            "avg_frame_ms": round(avg, 2),
+            "max_frame_ms": round(max(times), 2) if times else 0,
+            "fps": round(1000 / avg, 1) if avg else 0,
+        }
+
+
+def lerp(a, b, t):
+    return a + (b - a) * t
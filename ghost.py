@@ -0,0 +1,116 @@
+"""NeonRunner run recordings in a fixed-width binary format, and ghosts.
+
+A recording is a 20-byte header followed by one 16-byte record per
+simulation step:
+
+    y        float32   player's top edge after the step
+    score    uint32    score after the step
+    w, h     int16     obstacle spawned on the step, 0 if none
+    typ      int8      its course type (BLOCK / SPIKE), -1 if none
+    flags    uint8     bit 0: jump input
+    speed    float16   its speed, at half precision
+
+Every field sits at a fixed offset, so frame i of a run is read straight
+out of the buffer with struct.unpack_from(). Ghost.open() memory-maps
+the file: opening is O(1) and reading frame i touches only that frame,
+however long the run was.
+"""
+import logging
+import mmap
+import struct
+
+log = logging.getLogger("ghost")
+
+MAGIC = b"NRUN"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")      # magic, version, step_ms, seed, frames, score
+FRAME = struct.Struct("<fIhhbBe")
+Y = struct.Struct("<f")
+SCORE = struct.Struct("<I")
+NO_SPAWN = (0, 0, -1, 0.0)
+
+
+# ================= RECORDING ==================
+class RunRecorder:
+    """Packs one record per step into a growing bytearray."""
+
+    def __init__(self, seed, step_ms):
+        self.seed = seed
+        self.step_ms = step_ms
+        self.frames = bytearray()
+        self.n = 0
+        self.score = 0
+        self.spawn = NO_SPAWN
+
+    def __len__(self):
+        return self.n
+
+    def spawned(self, w, h, typ, speed):
+        """Note an obstacle spawned on the step being recorded."""
+        self.spawn = (w, h, typ, speed)
+
+    def record(self, y, score, bits):
+        w, h, typ, speed = self.spawn
+        self.frames += FRAME.pack(y, score, w, h, typ, bits, speed)
+        self.spawn = NO_SPAWN
+        self.score = score
+        self.n += 1
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, VERSION, self.step_ms, self.seed,
+                           self.n, self.score) + self.frames
+
+
+# ================= PLAYBACK ==================
+class Ghost:
+    """A recording read in place; `data` is bytes or an mmap."""
+
+    def __init__(self, data):
+        magic, version, self.step_ms, self.seed, self.frames, self.score = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a run recording")
+        if len(data) < HEADER.size + self.frames * FRAME.size:
+            raise ValueError("truncated run recording")
+        self.data = data
+
+    @classmethod
+    def open(cls, path):
+        """Map the recording at `path`; None if missing or unusable."""
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:     # ValueError: empty file
+            log.warning("ignoring unreadable %s: %s", path, e)
+            return None
+        try:
+            return cls(data)
+        except (ValueError, struct.error) as e:
+            data.close()
+            log.warning("ignoring %s: %s", path, e)
+            return None
+
+    def __len__(self):
+        return self.frames
+
+    def y(self, i):
+        return Y.unpack_from(self.data, HEADER.size + i * FRAME.size)[0]
+
+    def score_at(self, i):
+        return SCORE.unpack_from(self.data, HEADER.size + i * FRAME.size + Y.size)[0]
+
+    def frame(self, i):
+        """(y, score, w, h, typ, flags, speed) of step i."""
+        return FRAME.unpack_from(self.data, HEADER.size + i * FRAME.size)
+
+    @property
+    def mapped(self):
+        """Whether this ghost holds its file open (see open())."""
+        return isinstance(self.data, mmap.mmap)
+
+    def close(self):
+        """Unmap the file, if this ghost was opened from one."""
+        if self.mapped:
+            self.data.close()
@@ -0,0 +1,78 @@
+# ================= RETAINED HUD ==================
+class HudWidget:
+    """One canvas text item bound to a value.
+
+    set() only records the new value; the text item is reconfigured in
+    flush(), and only if the value actually changed since the last flush.
+    Hidden widgets keep tracking their value and catch up when shown.
+    """
+
+    def __init__(self, canvas, x, y, fmt, value=None, visible=True, tags="hud", **options):
+        self.canvas = canvas
+        self.fmt = fmt
+        self.value = value
+        self.drawn = value
+        self.visible = visible
+        self.item = canvas.create_text(
+            x, y, text=self.format(value),
+            state="normal" if visible else "hidden", tags=tags, **options)
+
+    def format(self, value):
+        return "" if value is None else self.fmt.format(value)
+
+    def set(self, value):
+        self.value = value
+
+    def flush(self):
+        if self.visible and self.value != self.drawn:
+            self.canvas.itemconfig(self.item, text=self.format(self.value))
+            self.drawn = self.value
+            return True
+        return False
+
+    def show(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.canvas.itemconfig(self.item, state="normal" if visible else "hidden")
+            self.flush()
+
+
+class Hud:
+    """Named HUD widgets, flushed together at most once per frame."""
+
+    def __init__(self, canvas, tag="hud"):
+        self.canvas = canvas
+        self.tag = tag
+        self.widgets = {}
+        self.groups = {}
+        self.updates = 0
+
+    def add(self, name, x, y, fmt, value=None, group=None, visible=True, **options):
+        widget = HudWidget(self.canvas, x, y, fmt, value, visible, self.tag, **options)
+        self.widgets[name] = widget
+        if group:
+            self.groups.setdefault(group, []).append(widget)
+        return widget
+
+    def __getitem__(self, name):
+        return self.widgets[name]
+
+    def set(self, name, value):
+        self.widgets[name].value = value
+
+    def visible(self, group):
+        return any(w.visible for w in self.groups.get(group, ()))
+
+    def toggle(self, group):
+        show = not self.visible(group)
+        for widget in self.groups.get(group, ()):
+            widget.show(show)
+
+    def lift(self):
+        """Put the HUD back above items created after it."""
+        self.canvas.tag_raise(self.tag)
+
+    def flush(self):
+        for widget in self.widgets.values():
+            if widget.flush():
+                self.updates += 1
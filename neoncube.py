@@ -1,8 +1,25 @@
 # neon_runner.py
-import tkinter as tk
+import logging
 import random
-import json
-import os
+import sys
+from copy import copy
+from operator import attrgetter
+
+from collision import sweep
+from course import TYPES, Course, Difficulty
+from gameloop import lerp
+from ghost import Ghost, RunRecorder
+from hud import Hud
+from parallax import ParallaxLayer, paint_buildings, paint_stars
+from perf import FrameProfiler, PerfOverlay
+from pool import PoolSet
+from quality import QualityGovernor
+from render import RENDERERS
+from replay import InputLog, checksum, derive_seed, new_seed
+from scores import ScoreStore
+from simthread import Driver
+from sprites import Sprite, SpriteCache
+from timers import Scheduler
 
 WIDTH, HEIGHT = 900, 500
 FPS_MS = 16
@@ -10,60 +27,44 @@ GRAVITY = 0.9
 JUMP_V = -15
 GROUND_H = 110
 OBSTACLE_GAP_BASE = 140
+MAX_OBSTACLES = 6
+MAX_OBSTACLE_W = 60
 SCORE_FILE = "neon_runner_highscore.json"
-
-def load_highscore():
-    try:
-        if os.path.exists(SCORE_FILE):
-            with open(SCORE_FILE, "r") as f:
-                return json.load(f).get("highscore", 0)
-    except:
-        pass
-    return 0
-
-def save_highscore(score):
-    try:
-        with open(SCORE_FILE, "w") as f:
-            json.dump({"highscore": score}, f)
-    except:
-        pass
-
-
+RUN_LOG = "neon_runner_runs.jsonl"
+RUN_HISTORY = "neon_runner_history.jsonl"
+GHOST_FILE = "neon_runner_best.run"
+GHOST_DX = -50          # the ghost runs this far left of the player
+SPRITE_DIR = "sprite_cache"
+JUMP_BIT = 1
+
+# visible background layers per quality level, full quality first;
+# the farthest layers go first
+QUALITY = (
+    {"star_layers": 2, "city_layers": 3},
+    {"star_layers": 1, "city_layers": 3},
+    {"star_layers": 0, "city_layers": 3},
+    {"star_layers": 0, "city_layers": 2},
+)
+
+
+# Player and Obstacle are plain models: positions live here, never in the
+# canvas. prev_y / prev_x hold the position before the last step, for
+# render interpolation.
 class Player:
-    def __init__(self, canvas, x, y, w=36, h=36, color="#00FFF6"):
-        self.canvas = canvas
+    def __init__(self, x, y, w=36, h=36):
         self.x = x
         self.y = y
+        self.prev_y = y
         self.w = w
         self.h = h
         self.vy = 0
         self.on_ground = False
 
-        # glow
-        self.glow = canvas.create_oval(
-            self.x-14, self.y-6,
-            self.x+self.w+14, self.y+self.h+6,
-            fill="#00384D", outline=""
-        )
-
-        self.id = canvas.create_rectangle(
-            self.x, self.y,
-            self.x+self.w, self.y+self.h,
-            fill=color, outline="#0FFFE6", width=2
-        )
-
     def bbox(self):
-        return self.canvas.bbox(self.id)
-
-    def update_graphic(self):
-        self.canvas.coords(self.glow,
-                           self.x-14, self.y-6,
-                           self.x+self.w+14, self.y+self.h+6)
-        self.canvas.coords(self.id,
-                           self.x, self.y,
-                           self.x+self.w, self.y+self.h)
+        return self.x, self.y, self.x+self.w, self.y+self.h
 
     def apply_gravity(self):
+        self.prev_y = self.y
         self.vy += GRAVITY
         self.y += self.vy
 
@@ -74,8 +75,6 @@ class Player:
         else:
             self.on_ground = False
 
-        self.update_graphic()
-
     def jump(self):
         if self.on_ground:
             self.vy = JUMP_V
@@ -83,53 +82,244 @@ class Player:
 
 
 class Obstacle:
-    def __init__(self, canvas, x, y, w, h, speed, typ="block", color="#FF5A8F"):
-        self.canvas = canvas
+    def __init__(self, key, x, y, w, h, speed, typ="block"):
+        self.key = key          # names its canvas item, on snapshot copies too
         self.x = x
+        self.prev_x = x
         self.y = y
         self.w = w
         self.h = h
         self.speed = speed
         self.typ = typ
+        self.counted = False
 
-        self.id = canvas.create_rectangle(x, y, x+w, y+h, fill=color, outline="")
+    def update(self):
+        self.prev_x = self.x
+        self.x -= self.speed
+        return self.x + self.w >= -50
 
-        if typ != "block":
-            self.top = canvas.create_rectangle(x, y, x+w, y+int(h*0.25),
-                                               fill="#FFD166", outline="")
-        else:
-            self.top = None
+    def bbox(self):
+        return self.x, self.y, self.x+self.w, self.y+self.h
 
-    def update(self):
-        dx = -self.speed
-        self.x += dx
-        self.canvas.move(self.id, dx, 0)
-        if self.top:
-            self.canvas.move(self.top, dx, 0)
-
-        if self.x + self.w < -50:
-            self.destroy()
+
+# ----------------------------------------
+# WORLD
+# ----------------------------------------
+# One run's simulation, with no canvas: NeonRunner steps it on the Tk
+# thread or on a SimThread, and replays step it headlessly.
+class World:
+    def __init__(self, profiler=None, seed=0):
+        self.profiler = profiler or FrameProfiler(enabled=False)
+        self.player = Player(120, HEIGHT - GROUND_H - 36)
+
+        self.running = False
+        self.paused = False
+        self.over = False           # the run ended; cleared by start()
+        self.run = 0                # runs started, so views can tell them apart
+        self.timers = Scheduler()   # game clock; frozen while paused
+        self.spawn_timer = None
+        self.difficulty = Difficulty(gap_base=OBSTACLE_GAP_BASE)
+        self.spawn_gap = OBSTACLE_GAP_BASE
+        self.base_speed = 6
+        self.score = 0
+        self.obstacles = []         # kept sorted by x for the collision sweep
+        self.max_obstacles = MAX_OBSTACLES
+        self.jumpable = True        # only generate courses that can be cleared
+        self.course = None
+        self.next_key = 0
+
+        self.frame = 0              # steps into this run
+        self.steps = 0              # steps over every run, and the ground
+        self.scroll = 0.0           # scrolled meanwhile; the view's parallax follows
+
+        self.log = InputLog("neoncube", seed, FPS_MS)
+        self.recorder = RunRecorder(seed, FPS_MS)
+
+    def start(self, seed):
+        if self.running:
             return False
+
+        self.running = True
+        self.paused = False
+        self.over = False
+        self.run += 1
+        self.score = 0
+        self.base_speed = self.difficulty.base_speed
+        self.spawn_gap = self.difficulty.gap_base
+        self.obstacles = []
+        self.frame = 0
+
+        p = self.player
+        p.y = p.prev_y = HEIGHT - GROUND_H - p.h
+        p.vy = 0
+        p.on_ground = True
+
+        self.log = InputLog("neoncube", seed, FPS_MS)
+        self.recorder = RunRecorder(seed, FPS_MS)
+
+        # the whole course comes from the seed; the first chunk is rolled here
+        self.course = Course(seed, self.difficulty, self.max_obstacles,
+                             spawn_x=WIDTH + 30, ground=HEIGHT - GROUND_H,
+                             player=(p.x, p.w, p.h), jump_v=JUMP_V, gravity=GRAVITY,
+                             checked=self.jumpable)
+        self.timers = Scheduler()
+        self.spawn_timer = self.timers.after(self.course.peek()[0] * FPS_MS,
+                                             self.spawn_obstacle)
         return True
 
-    def bbox(self):
-        return self.canvas.bbox(self.id)
+    def toggle_pause(self):
+        if not self.running:
+            return
+        self.paused = not self.paused
+        if self.paused:
+            self.timers.pause()
+        else:
+            self.timers.resume()
+
+    def end(self):
+        self.running = False
+        self.over = True
+
+    def spawn_obstacle(self):
+        # rolled, escalated and checked ahead of time by the course
+        _, w, height, typ, speed = self.course.pop()
+        self.recorder.spawned(w, height, typ, speed)
+        x = WIDTH + 30
+        y = HEIGHT - GROUND_H - height
 
-    def destroy(self):
-        self.canvas.delete(self.id)
-        if self.top:
-            self.canvas.delete(self.top)
+        self.obstacles.append(Obstacle(self.next_key, x, y, w, height, speed, TYPES[typ]))
+        self.next_key += 1
 
+        frame = self.course.peek()[0]
+        self.spawn_timer = self.timers.after(
+            frame * FPS_MS - self.timers.now, self.spawn_obstacle)
 
+    def step(self, bits):
+        # keep last positions current so a paused frame interpolates to itself
+        player = self.player
+        player.prev_y = player.y
+        for ob in self.obstacles:
+            ob.prev_x = ob.x
+
+        if not self.running or self.paused:
+            return
+
+        prof = self.profiler
+        prof.lap("loop")
+        self.frame += 1
+        self.steps += 1
+        self.scroll += self.base_speed / 200
+
+        if bits & JUMP_BIT:
+            player.jump()
+        player.apply_gravity()
+        prof.lap("gravity")
+
+        # timers (obstacle spawns)
+        self.timers.advance(FPS_MS)
+        prof.lap("spawn")
+
+        # move obstacles
+        newlist = [ob for ob in self.obstacles if ob.update()]
+        # speeds differ slightly, so an obstacle can overtake another;
+        # the list is nearly sorted and Timsort restores order in O(n)
+        newlist.sort(key=attrgetter("x"))
+        self.obstacles = newlist
+        prof.lap("obstacles")
+
+        # collision: only obstacles overlapping the player's x-range
+        px1, py1, px2, py2 = player.bbox()
+        for ob in sweep(self.obstacles, px1, px2, MAX_OBSTACLE_W):
+            ex1, ey1, ex2, ey2 = ob.bbox()
+            if not (px2 < ex1 or px1 > ex2 or py2 < ey1 or py1 > ey2):
+                self.end()
+                break
+        prof.lap("collision")
+
+        # score: obstacles starting right of the player can't have passed it
+        for ob in self.obstacles:
+            if ob.x >= player.x:
+                break
+            if ob.x + ob.w < player.x and not ob.counted:
+                ob.counted = True
+                self.score += 1
+
+                d = self.difficulty
+                if self.score % d.every == 0:
+                    self.base_speed += d.speed_step
+                    self.spawn_gap = max(d.gap_min, self.spawn_gap - d.gap_step)
+
+        self.log.record(bits, self.checksum())
+        self.recorder.record(player.y, self.score, bits)
+        prof.lap("score")
+
+    def checksum(self):
+        p = self.player
+        return checksum(
+            self.score, self.running, self.timers.now, self.timers.remaining(self.spawn_timer),
+            self.spawn_gap, self.base_speed,
+            p.y, p.vy,
+            [(ob.x, ob.y, ob.w, ob.h, ob.speed, ob.typ) for ob in self.obstacles],
+        )
+
+    def snapshot(self):
+        return Snapshot(self)
+
+
+# What NeonRunner.render() reads from a World, copied so another thread
+# can draw it while the World moves on. Never changed after it is made.
+class Snapshot:
+    def __init__(self, w):
+        self.player = copy(w.player)
+        self.obstacles = tuple(copy(ob) for ob in w.obstacles)
+        self.running = w.running
+        self.paused = w.paused
+        self.over = w.over
+        self.run = w.run
+        self.score = w.score
+        self.frame = w.frame
+        self.steps = w.steps
+        self.scroll = w.scroll
+
+
+# ----------------------------------------
+# VIEW
+# ----------------------------------------
+# Draws a World, or with threaded=True the newest Snapshot of one that
+# the Driver's worker published; holds no game state of its own.
 class NeonRunner:
-    def __init__(self, root):
+    def __init__(self, root, canvas=None, seed=None, images=None, render="canvas",
+                 scores=None, sprite_dir=SPRITE_DIR, threaded=False):
         self.root = root
+        if canvas is None or images is None:
+            # Tk only for a real window; tools pass their own canvas and images
+            import tkinter as tk
+            images = images or (
+                lambda w, h: tk.PhotoImage(master=root, width=w, height=h))
+            canvas = canvas or tk.Canvas(root, width=WIDTH, height=HEIGHT,
+                                         bg="#04061a", highlightthickness=0)
         root.title("Neon Runner")
         root.resizable(False, False)
 
-        self.canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT,
-                                bg="#04061a", highlightthickness=0)
+        self.canvas = canvas
         self.canvas.pack()
+        self.renderer = RENDERERS[render](self.canvas, WIDTH, HEIGHT, "#04061a", images)
+        self.canvas = self.renderer.surface
+        self.make_image = self.renderer.make_image
+        self.pools = PoolSet(self.canvas)
+        self.sprites = SpriteCache(self.make_image, disk=sprite_dir)
+
+        # Randomness: each run gets its own gameplay seed drawn from the
+        # session seed; parallax uses a separate stream
+        self.session_seed = new_seed() if seed is None else seed
+        self.session_rng = random.Random(self.session_seed)
+        self.fx_rng = random.Random(derive_seed(self.session_seed, "fx"))
+
+        # Instrumentation (F3 overlay, F4 export)
+        self.profiler = FrameProfiler()
+        self.driver = Driver(root, self.step, self.render, FPS_MS, self.profiler, threaded)
+        self.loop = self.driver.loop
+        self.world = World(self.driver.world_profiler, self.session_seed)
 
         # Ground
         self.canvas.create_rectangle(
@@ -137,40 +327,57 @@ class NeonRunner:
             fill="#071126", outline=""
         )
 
-        # Score UI
-        self.hi = load_highscore()
-        self.score_text = self.canvas.create_text(
-            18, 12, anchor="nw",
-            text="Score: 0",
-            font=("Consolas", 18, "bold"),
-            fill="#00FFC6"
-        )
-        self.hi_text = self.canvas.create_text(
-            WIDTH-18, 12, anchor="ne",
-            text=f"Best: {self.hi}",
-            font=("Consolas", 14),
-            fill="#FFD166"
-        )
-
-        # Parallax
+        # Score UI (F2 toggles the fps / entity readout). The store reads
+        # its files in the background; render() shows the best once it's in
+        self.scores = scores or ScoreStore(SCORE_FILE, RUN_LOG, ghost_path=GHOST_FILE,
+                                           history_path=RUN_HISTORY)
+        self.hi = 0
+        self.hi_loaded = False
+        self.hud = Hud(self.canvas)
+        self.hud.add("score", 18, 12, "Score: {}", 0, anchor="nw",
+                     font=("Consolas", 18, "bold"), fill="#00FFC6")
+        self.hud.add("best", WIDTH-18, 12, "Best: {}", self.hi, anchor="ne",
+                     font=("Consolas", 14), fill="#FFD166")
+        self.hud.add("ghost", 18, 40, "Ghost: {}", 0, visible=False, anchor="nw",
+                     font=("Consolas", 12), fill="#7FA8C9")
+        self.hud.add("fps", WIDTH-18, 36, "{} fps", group="stats", visible=False,
+                     anchor="ne", font=("Consolas", 10), fill="#9CFF9C")
+        self.hud.add("entities", WIDTH-18, 52, "{} obstacles", group="stats", visible=False,
+                     anchor="ne", font=("Consolas", 10), fill="#9CFF9C")
+        self.hud.add("quality", WIDTH-18, 68, "quality {}", group="stats", visible=False,
+                     anchor="ne", font=("Consolas", 10), fill="#9CFF9C")
+
+        # Parallax; scrolled in render() to catch up with the World
         self.city_layers = []
-        self.stars = []
+        self.star_layers = []
         self.create_city_layers()
         self.create_stars(80)
-
-        # Player
-        px = 120
-        py = HEIGHT - GROUND_H - 36
-        self.player = Player(self.canvas, px, py)
-
-        # State
-        self.running = False
-        self.paused = False
-        self.spawn_timer = 0
-        self.spawn_gap = OBSTACLE_GAP_BASE
-        self.base_speed = 6
-        self.score = 0
-        self.obstacles = []
+        self.scrolled_steps = 0
+        self.scrolled = 0.0
+
+        # Player: body and glow, pre-rendered into one image
+        p = self.world.player
+        sprite = Sprite((("rectangle", (0, 0, p.w, p.h), "#00FFF6", "#0FFFE6", 2),),
+                        glow=7, glow_color="#00FFF6")
+        self.player_pad = sprite.pad
+        self.player_image = self.sprites.get(sprite)
+        self.player_item = self.canvas.create_image(
+            p.x - self.player_pad, p.y - self.player_pad,
+            image=self.player_image, anchor="nw")
+
+        # Obstacles: body and cap in one image, one pool of image items for
+        # every size; obstacle key -> canvas item
+        self.obstacle_pool = self.pools.get("image", anchor="nw")
+        self.obstacle_items = {}
+
+        self.started = 0            # runs asked of the World so far
+        self.ended = 0              # last run whose game over was drawn
+
+        # Best run so far, replayed beside the player; mapped from disk by
+        # start() once the store has loaded, replaced in memory by a new best
+        self.ghost = None
+        self.ghost_item = None
+        self.ghost_shown = False
 
         # Input
         root.bind("<KeyPress>", self.key_down)
@@ -179,7 +386,12 @@ class NeonRunner:
         # Start screen
         self.draw_start_overlay()
 
-        self.root.after(FPS_MS, self.loop)
+        self.perf_overlay = PerfOverlay(self.canvas, self.profiler, x=18, y=44,
+                                        counts=("n_items", "n_obstacles"))
+        self.governor = QualityGovernor(QUALITY, self.apply_quality, FPS_MS,
+                                        name="neoncube")
+
+        self.driver.start(self.world)
 
     # ----------------------------------------
     # START SCREEN
@@ -213,8 +425,11 @@ class NeonRunner:
 
         self.root.bind("<Return>", lambda e: self.start())
 
-    def start(self):
-        if self.running:
+    def start(self, seed=None):
+        w = self.driver.latest()
+        # threaded, the snapshot lags the World: a run that ended isn't
+        # over until it's drawn, and a start already sent is pending
+        if w.running or self.ended != w.run or self.started > w.run:
             return
 
         # Remove overlay + texts
@@ -224,17 +439,57 @@ class NeonRunner:
             except:
                 pass
 
-        # Reset game state
-        self.running = True
-        self.paused = False
-        self.score = 0
-        self.spawn_timer = 0
-        self.base_speed = 6
-        self.spawn_gap = OBSTACLE_GAP_BASE
-        self.obstacles = []
-
-        self.canvas.itemconfig(self.score_text, text="Score: 0")
-        self.canvas.itemconfig(self.hi_text, text=f"Best: {self.hi}")
+        if seed is None:
+            seed = self.session_rng.randrange(2**32)
+        self.start_ghost()
+        self.started = w.run + 1
+        self.driver.call(self.world.start, seed)
+
+        self.hud.set("score", 0)
+        self.hud.set("best", self.hi)
+
+    def start_ghost(self):
+        # not before the store has loaded: until then it may still write
+        # the best of the runs recorded meanwhile
+        if self.ghost is None and self.scores.ghost_path and self.scores.loaded.is_set():
+            self.ghost = Ghost.open(self.scores.ghost_path)
+        if self.ghost is None:
+            self.hud["ghost"].show(False)
+            return
+        if self.ghost_item is None:
+            self.ghost_shown = True
+            p = self.world.player
+            sprite = Sprite((("rectangle", (0, 0, p.w, p.h), "#7FA8C9", "#BFEAF5", 2),),
+                            opacity=0.4)
+            self.ghost_pad = sprite.pad
+            self.ghost_image = self.sprites.get(sprite)
+            self.ghost_item = self.canvas.create_image(
+                0, 0, image=self.ghost_image, anchor="nw")
+            self.canvas.tag_raise(self.player_item)
+        self.show_ghost(True)
+        self.hud.set("ghost", 0)
+        self.hud["ghost"].show(True)
+
+    def show_ghost(self, shown):
+        if shown != self.ghost_shown:
+            self.ghost_shown = shown
+            self.canvas.itemconfig(self.ghost_item, state="normal" if shown else "hidden")
+
+    def update_ghost(self, w, alpha):
+        # frame n of this run lines up with frame n of the ghost's
+        n = w.frame
+        if n > len(self.ghost):
+            self.show_ghost(False)      # the ghost's run ended here
+            return
+        if n == 0:
+            y = w.player.y
+        else:
+            y = self.ghost.y(n - 1)
+            if n > 1 and not w.paused:
+                y = lerp(self.ghost.y(n - 2), y, alpha)
+            self.hud.set("ghost", self.ghost.score_at(n - 1))
+        self.canvas.coords(self.ghost_item, w.player.x + GHOST_DX - self.ghost_pad,
+                           y - self.ghost_pad)
 
     # ----------------------------------------
 
@@ -244,140 +499,163 @@ class NeonRunner:
         base = HEIGHT - GROUND_H
 
         for i in range(3):
-            group = []
-            for x in range(0, WIDTH+200, 120 + i*30):
-                h = random.randint(heights[i]//2, heights[i])
-                r = self.canvas.create_rectangle(
-                    x, base-h, x+100, base,
-                    fill=colors[i], outline=""
-                )
-                group.append(r)
-            self.city_layers.append({"items": group, "vx": -0.4*(i+1)})
+            paint = paint_buildings(self.fx_rng, colors[i], 120 + i*30,
+                                    heights[i]//2, heights[i])
+            layer = ParallaxLayer(self.canvas, self.make_image,
+                                  base - heights[i], WIDTH, heights[i],
+                                  -0.4*(i+1), paint, f"city{i}")
+            self.city_layers.append(layer)
 
     def create_stars(self, count):
-        for _ in range(count):
-            x = random.randint(0, WIDTH)
-            y = random.randint(0, HEIGHT-150)
-            r = random.choice([1, 1, 2])
-
-            dot = self.canvas.create_oval(
-                x, y, x+r, y+r,
-                fill="#9FBFFF", outline=""
-            )
-
-            self.stars.append({
-                "id": dot,
-                "vx": -0.08 - random.random()*0.12,
-                "vy": 0.02*random.random(),
-                "r": r
-            })
+        # two depths instead of a speed per star; one move per depth
+        for i, vx in enumerate((-0.1, -0.18)):
+            paint = paint_stars(self.fx_rng, "#9FBFFF", count // 2)
+            layer = ParallaxLayer(self.canvas, self.make_image,
+                                  0, WIDTH, HEIGHT-150, vx, paint, f"stars{i}")
+            self.star_layers.append(layer)
 
     # ----------------------------------------
 
     def key_down(self, e):
         if e.keysym in ("space", "Up"):
-            if self.running and not self.paused:
-                self.player.jump()
-        if e.keysym.lower() == "p" and self.running:
-            self.paused = not self.paused
-        if e.keysym == "Return" and not self.running:
+            self.driver.send(JUMP_BIT)
+        if e.keysym.lower() == "p":
+            self.driver.call(self.world.toggle_pause)
+        if e.keysym == "Return":
             self.start()
+        if e.keysym == "F2":
+            self.hud.toggle("stats")
+        if e.keysym == "F3":
+            self.perf_overlay.toggle()
+        if e.keysym == "F4":
+            self.profiler.export("neoncube")
+        if e.keysym == "F5":
+            log = self.world.log    # only complete once the run is over
+            log.save(f"neoncube-{log.seed}.replay.json")
 
     def key_up(self, e):
         pass
 
     # ----------------------------------------
 
-    def spawn_obstacle(self):
-        typ = random.choice(["block","block","spike"])
-        height = random.randint(30, 80) if typ == "block" else random.randint(40, 90)
-        w = random.randint(28, 60) if typ=="block" else random.randint(18, 28)
-        x = WIDTH + 30
-        y = HEIGHT - GROUND_H - height
-
-        speed = self.base_speed + random.random()*1.8
-        color = "#FF5A8F" if typ=="block" else "#FF8A65"
-
-        ob = Obstacle(self.canvas, x, y, w, height, speed, typ=typ, color=color)
-        self.obstacles.append(ob)
+    def move_city_and_stars(self, w):
+        # catch up with the steps the World took since the last frame;
+        # hidden layers don't scroll, nobody sees them fall behind
+        steps = w.steps - self.scrolled_steps
+        if not steps:
+            return
+        ground = w.scroll - self.scrolled
+        self.scrolled_steps, self.scrolled = w.steps, w.scroll
 
-    # ----------------------------------------
+        for layer in self.star_layers:
+            if layer.visible:
+                layer.scroll(layer.vx * steps)
 
-    def move_city_and_stars(self):
-        # stars
-        for s in self.stars:
-            self.canvas.move(s["id"], s["vx"], s["vy"])
-            x1, y1, x2, y2 = self.canvas.coords(s["id"])
-            if x2 < -10:
-                nx = WIDTH + random.randint(10, 300)
-                ny = random.randint(10, HEIGHT-200)
-                self.canvas.coords(s["id"], nx, ny, nx+s["r"], ny+s["r"])
-
-        # buildings
         for layer in self.city_layers:
-            vx = layer["vx"] - (self.base_speed/200)
-            for item in layer["items"]:
-                self.canvas.move(item, vx, 0)
-                x1, y1, x2, y2 = self.canvas.coords(item)
-                if x2 < -120:
-                    nx = WIDTH + random.randint(0, 200)
-                    h = random.randint(20, 120)
-                    base = HEIGHT - GROUND_H
-                    self.canvas.coords(item, nx, base-h, nx+100, base)
+            if layer.visible:
+                layer.scroll(layer.vx * steps - ground)
+
+    def apply_quality(self, q):
+        for layers, n in ((self.star_layers, q["star_layers"]),
+                          (self.city_layers, q["city_layers"])):
+            for i, layer in enumerate(layers):
+                layer.show(i >= len(layers) - n)
+
+    def sync_obstacles(self, obstacles, alpha):
+        items = self.obstacle_items
+        for ob in obstacles:
+            x = lerp(ob.prev_x, ob.x, alpha)
+            item = items.get(ob.key)
+            if item is None:
+                items[ob.key] = self.obstacle_pool.acquire(
+                    x, ob.y, image=self.obstacle_image(ob))
+            else:
+                self.canvas.coords(item, x, ob.y)
+        if len(items) != len(obstacles):
+            alive = {ob.key for ob in obstacles}
+            for key in [key for key in items if key not in alive]:
+                self.obstacle_pool.release(items.pop(key))
+
+    def obstacle_image(self, ob):
+        layers = (("rectangle", (0, 0, ob.w, ob.h),
+                   "#FF5A8F" if ob.typ == "block" else "#FF8A65", None, 0),)
+        if ob.typ != "block":
+            layers += (("rectangle", (0, 0, ob.w, int(ob.h*0.25)), "#FFD166", None, 0),)
+        return self.sprites.get(Sprite(layers))
 
     # ----------------------------------------
 
-    def loop(self):
-        if self.running and not self.paused:
-            self.move_city_and_stars()
-            self.player.apply_gravity()
-
-            # spawn
-            if self.spawn_timer % max(1, int(self.spawn_gap)) == 0:
-                if len(self.obstacles) < 6:
-                    self.spawn_obstacle()
-
-            # move obstacles
-            newlist = []
-            for ob in self.obstacles:
-                if ob.update():
-                    newlist.append(ob)
-            self.obstacles = newlist
-
-            # collision
-            pb = self.player.bbox()
-            if pb:
-                px1, py1, px2, py2 = pb
-                for ob in self.obstacles:
-                    ex1, ey1, ex2, ey2 = ob.bbox()
-                    if not (px2 < ex1 or px1 > ex2 or py2 < ey1 or py1 > ey2):
-                        self.game_over()
-                        break
-
-            # score
-            for ob in self.obstacles:
-                if ob.x + ob.w < self.player.x and not hasattr(ob, "counted"):
-                    ob.counted = True
-                    self.score += 1
-                    self.canvas.itemconfig(self.score_text,
-                                           text=f"Score: {self.score}")
-
-                    if self.score % 5 == 0:
-                        self.base_speed += 18
-                        self.spawn_gap = max(80, self.spawn_gap -8)
-
-            self.spawn_timer += 1
-
-        self.root.after(FPS_MS, self.loop)
+    def step(self, events):
+        # on the driver's worker thread if threaded: no Tk calls here
+        world = self.world
+        jump = events and world.running and not world.paused
+        world.step(JUMP_BIT if jump else 0)
+
+    def render(self, alpha=1.0, view=None):
+        w = self.world if view is None else view
+        prof = self.profiler
+        prof.lap("loop")
+        self.governor.sample(self.loop.work_ms)
+
+        self.move_city_and_stars(w)
+        prof.lap("parallax")
+
+        p = w.player
+        y = lerp(p.prev_y, p.y, alpha)
+        self.canvas.coords(self.player_item, p.x - self.player_pad, y - self.player_pad)
+        if self.ghost_shown and w.running:
+            self.update_ghost(w, alpha)
+        self.sync_obstacles(w.obstacles, alpha)
+        prof.lap("render")
+
+        if w.over and self.ended != w.run:
+            self.game_over(w)
+
+        hud = self.hud
+        hud.set("score", w.score)
+        if not self.hi_loaded and self.scores.loaded.is_set():
+            self.hi_loaded = True
+            self.hi = max(self.hi, self.scores.highscore)
+            hud.set("best", self.hi)
+        if hud.visible("stats"):
+            hud.set("fps", round(self.loop.fps()))
+            hud.set("entities", len(w.obstacles))
+            hud.set("quality", self.governor.level)
+        hud.flush()
+        prof.lap("hud")
+
+        self.renderer.present()
+        prof.lap("present")
+
+        self.perf_overlay.update()
+        if prof.record is not None:
+            # a Tcl round-trip copying every item id: only while it's shown
+            if self.perf_overlay.visible:
+                prof.count("n_items", len(self.canvas.find_all()))
+            prof.count("n_obstacles", len(w.obstacles))
 
     # ----------------------------------------
 
-    def game_over(self):
-        self.running = False
-
-        if self.score > self.hi:
-            self.hi = self.score
-            save_highscore(self.hi)
+    def game_over(self, w):
+        self.ended = w.run
+        if self.ghost_shown:
+            self.show_ghost(False)
+
+        # the World's run is over, so a worker thread leaves these alone
+        # until the next start(), which can't be sent before this returns
+        log = self.world.log
+        recording = self.world.recorder.to_bytes()
+
+        # a mapped ghost lets go of its file before record(): if the store
+        # finds a new best it replaces the file, which a mapping would block
+        if self.ghost is not None and self.ghost.mapped:
+            self.ghost.close()
+            self.ghost = None           # mapped again by the next start()
+        # queued for the writer thread; never waits on the disk
+        best = self.scores.record(w.score, len(log) * FPS_MS, log.seed, recording)
+        self.hi = max(self.hi, w.score)
+        if best:
+            self.ghost = Ghost(recording)   # the next runs chase this one
 
         overlay = self.canvas.create_rectangle(
             0, 0, WIDTH, HEIGHT,
@@ -393,7 +671,7 @@ class NeonRunner:
 
         self.canvas.create_text(
             WIDTH/2, HEIGHT/2,
-            text=f"Score: {self.score}",
+            text=f"Score: {w.score}",
             font=("Segoe UI", 20),
             fill="#FFFFFF"
         )
@@ -405,12 +683,29 @@ class NeonRunner:
             fill="#EAEAEA"
         )
 
-        self.canvas.itemconfig(self.hi_text, text=f"Best: {self.hi}")
+        self.hud.set("best", self.hi)
 
 
 # ----------------------------------------------------
 
-if __name__ == "__main__":
+def main(argv=None, startup=None):
+    """Open the window and play; `startup` is the launcher's StartupTimer."""
+    import tkinter as tk
+
+    argv = sys.argv[1:] if argv is None else argv
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
     root = tk.Tk()
-    NeonRunner(root)
+    if startup:
+        startup.mark("window")
+    runner = NeonRunner(root, threaded="--threaded" in argv,
+                        render="image" if "--image" in argv else "canvas")
+    if startup:
+        startup.mark("first frame")     # the loop draws it before returning
+        startup.shown(root)
     root.mainloop()
+    runner.driver.stop()
+    runner.scores.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# ================= SCROLLING IMAGE STRIPS ==================
+class ParallaxLayer:
+    """A background layer pre-rendered into two side-by-side image tiles.
+
+    Both tiles share one canvas tag, so scrolling the whole layer is a
+    single canvas.move(). When a tile slides fully off the left edge it
+    is moved behind the other one and repainted with fresh content; that
+    is the only time anything is drawn into the images.
+    """
+
+    def __init__(self, canvas, make_image, y, width, height, vx, paint, tag):
+        self.canvas = canvas
+        self.y = y
+        self.width = width
+        self.vx = vx
+        self.paint = paint
+        self.tag = tag
+
+        self.images = []
+        self.items = []
+        self.x = []
+        for i in range(2):
+            img = make_image(width, height)
+            paint(img)
+            self.images.append(img)
+            self.x.append(i * width)
+            self.items.append(canvas.create_image(
+                i * width, y, image=img, anchor="nw", tags=tag))
+
+        self.wraps = 0
+        self.visible = True
+
+    def show(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.canvas.itemconfig(self.tag, state="normal" if visible else "hidden")
+
+    def scroll(self, dx):
+        self.canvas.move(self.tag, dx, 0)
+        for i in range(2):
+            self.x[i] += dx
+            if self.x[i] + self.width <= 0:
+                self.x[i] += 2 * self.width
+                self.canvas.coords(self.items[i], self.x[i], self.y)
+                self.images[i].blank()
+                self.paint(self.images[i])
+                self.wraps += 1
+
+
+def paint_buildings(rng, color, spacing, min_h, max_h, bw=100):
+    """Painter for a row of buildings standing on the strip's bottom edge."""
+    def paint(img):
+        width, height = img.width(), img.height()
+        for x in range(0, width - bw + 1, spacing):
+            h = rng.randint(min_h, max_h)
+            img.put(color, to=(x, height - h, x + bw, height))
+    return paint
+
+
+def paint_stars(rng, color, count, sizes=(1, 1, 2)):
+    def paint(img):
+        width, height = img.width(), img.height()
+        for _ in range(count):
+            r = rng.choice(sizes)
+            x = rng.randint(0, width - r)
+            y = rng.randint(0, height - r)
+            img.put(color, to=(x, y, x + r, y + r))
+    return paint
@@ -0,0 +1,102 @@
+import numpy as np
+
+
+# ================= PARTICLE SYSTEM ==================
+class ParticleSystem:
+    """Struct-of-arrays particles: one NumPy array per field.
+
+    Live particles are packed into slots [0, count); update() advances
+    them all at once and compacts the survivors, keeping their order.
+    Emitting past `budget` (at most `capacity`, lowered to shed load)
+    drops the extra particles.
+    """
+
+    def __init__(self, capacity=400, gravity=0.05, rng=None):
+        self.capacity = capacity
+        self.budget = capacity
+        self.gravity = gravity
+        self.rng = rng or np.random.default_rng()
+        self.count = 0
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.px = np.zeros(capacity)     # position before the last update
+        self.py = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.color = np.zeros(capacity, dtype=np.int16)
+
+        # color string <-> index into self.palette
+        self.palette = []
+        self.color_index = {}
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, x, y, n, color, size=4):
+        start = self.count
+        end = min(self.budget, start + n)
+        if end <= start:
+            return 0
+        n = end - start
+
+        ci = self.color_index.get(color)
+        if ci is None:
+            ci = self.color_index[color] = len(self.palette)
+            self.palette.append(color)
+
+        rng = self.rng
+        self.x[start:end] = self.px[start:end] = x
+        self.y[start:end] = self.py[start:end] = y
+        self.dx[start:end] = rng.uniform(-1.2, 1.2, n)
+        self.dy[start:end] = rng.uniform(-2, 1, n)
+        self.life[start:end] = rng.integers(8, 16, n)
+        self.size[start:end] = size
+        self.color[start:end] = ci
+        self.count = end
+        return n
+
+    def update(self, k=1):
+        n = self.count
+        if not n:
+            return
+
+        self.px[:n] = self.x[:n]
+        self.py[:n] = self.y[:n]
+        self.x[:n] += self.dx[:n] * k
+        self.y[:n] += self.dy[:n] * k
+        self.dy[:n] += self.gravity * k
+        self.life[:n] -= k
+
+        keep = self.life[:n] > 0
+        m = int(keep.sum())
+        if m < n:
+            for a in (self.x, self.y, self.px, self.py, self.dx, self.dy,
+                      self.life, self.size, self.color):
+                a[:m] = a[:n][keep]
+            self.count = m
+
+    def clear(self):
+        self.count = 0
+
+    def snapshot(self):
+        return ParticleSnapshot(self)
+
+
+class ParticleSnapshot:
+    """Copy of the live particles with the fields a renderer reads."""
+
+    def __init__(self, ps):
+        n = self.count = ps.count
+        self.x = ps.x[:n].copy()
+        self.y = ps.y[:n].copy()
+        self.px = ps.px[:n].copy()
+        self.py = ps.py[:n].copy()
+        self.size = ps.size[:n].copy()
+        self.color = ps.color[:n].copy()
+        self.palette = tuple(ps.palette)
+
+    def __len__(self):
+        return self.count
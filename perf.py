@@ -0,0 +1,213 @@
+import csv
+import json
+import logging
+import time
+from collections import deque
+
+
+def percentile(values, q):
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    i = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[i]
+
+
+# ================= FRAME PROFILER ==================
+class FrameProfiler:
+    """Per-phase frame timings, kept for the last `history` frames.
+
+    begin() opens a frame record, lap(phase) charges the time since the
+    previous lap to `phase` (summed if a phase runs several times in one
+    frame, e.g. catch-up steps), count() stores a gauge such as an entity
+    count and end() closes the frame. Outside begin()/end() every call is
+    a no-op, so game code can lap unconditionally.
+
+    frame_ms is the work from begin() to end(); interval_ms is the time
+    since the previous begin(), idle time included, so frame rates come
+    from it.
+    """
+
+    def __init__(self, enabled=True, history=600, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.frames = deque(maxlen=history)
+        self.frame = 0
+        self.record = None
+        self.t0 = None
+        self.last = 0
+
+    def begin(self):
+        if not self.enabled:
+            return
+        now = self.clock()
+        self.record = {"frame": self.frame}
+        if self.t0 is not None:
+            self.record["interval_ms"] = (now - self.t0) * 1000
+        self.t0 = self.last = now
+
+    def lap(self, phase):
+        rec = self.record
+        if rec is None:
+            return
+        now = self.clock()
+        rec[phase] = rec.get(phase, 0) + (now - self.last) * 1000
+        self.last = now
+
+    def count(self, name, value):
+        if self.record is not None:
+            self.record[name] = value
+
+    def end(self):
+        rec = self.record
+        if rec is None:
+            return
+        rec["frame_ms"] = (self.clock() - self.t0) * 1000
+        self.frames.append(rec)
+        self.frame += 1
+        self.record = None
+
+    # ================= REPORTING ==================
+    def column(self, name):
+        return [f.get(name, 0) for f in self.frames]
+
+    def phases(self):
+        names = []
+        for f in self.frames:
+            for name, value in f.items():
+                if (isinstance(value, float) and name not in ("frame_ms", "interval_ms")
+                        and name not in names):
+                    names.append(name)
+        return names
+
+    def fps(self, last=None):
+        """Frames per second over the last `last` frame intervals (all if None)."""
+        intervals = [f["interval_ms"] for f in self.frames if "interval_ms" in f]
+        if last:
+            intervals = intervals[-last:]
+        total = sum(intervals)
+        return len(intervals) * 1000 / total if total else 0
+
+    def summary(self):
+        frame_ms = self.column("frame_ms")
+        out = {
+            "frames": len(frame_ms),
+            "fps": round(self.fps(), 1),
+            "frame_p50": round(percentile(frame_ms, 50), 3),
+            "frame_p99": round(percentile(frame_ms, 99), 3),
+            "phases": {},
+        }
+        for name in self.phases():
+            values = self.column(name)
+            out["phases"][name] = {
+                "mean": round(sum(values) / len(values), 3),
+                "p50": round(percentile(values, 50), 3),
+                "p99": round(percentile(values, 99), 3),
+            }
+        return out
+
+    def export_csv(self, path):
+        fields = []
+        for f in self.frames:
+            for name in f:
+                if name not in fields:
+                    fields.append(name)
+        with open(path, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=fields, restval=0)
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+    def export_jsonl(self, path):
+        with open(path, "w") as fh:
+            for f in self.frames:
+                fh.write(json.dumps(f) + "\n")
+
+    def export(self, prefix):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        paths = (f"{prefix}-perf-{stamp}.csv", f"{prefix}-perf-{stamp}.jsonl")
+        self.export_csv(paths[0])
+        self.export_jsonl(paths[1])
+        return paths
+
+
+# ================= OVERLAY ==================
+class PerfOverlay:
+    """Toggleable text readout of a FrameProfiler, drawn on the canvas."""
+
+    def __init__(self, canvas, profiler, x=10, y=40, every=15, counts=()):
+        self.canvas = canvas
+        self.profiler = profiler
+        self.x = x
+        self.y = y
+        self.every = every
+        self.counts = counts
+        self.item = None
+
+    @property
+    def visible(self):
+        return self.item is not None
+
+    def toggle(self):
+        if self.item is None:
+            self.item = self.canvas.create_text(
+                self.x, self.y, anchor="nw", text="",
+                fill="#9CFF9C", font=("Consolas", 10)
+            )
+            self.refresh()
+        else:
+            self.canvas.delete(self.item)
+            self.item = None
+
+    def update(self):
+        if self.item is not None and self.profiler.frame % self.every == 0:
+            self.refresh()
+
+    def refresh(self):
+        prof = self.profiler
+        s = prof.summary()
+        lines = [
+            f"FPS {prof.fps(self.every):5.1f}",
+            f"work/tick p50 {s['frame_p50']:.2f} ms   p99 {s['frame_p99']:.2f} ms",
+        ]
+        for name, p in s["phases"].items():
+            lines.append(f"{name:<10} {p['p50']:6.3f} {p['p99']:6.3f}")
+        last = prof.frames[-1] if prof.frames else {}
+        lines.append("  ".join(f"{name} {last.get(name, 0)}" for name in self.counts))
+        self.canvas.itemconfig(self.item, text="\n".join(lines))
+        self.canvas.tag_raise(self.item)
+
+
+# ================= STARTUP ==================
+class StartupTimer:
+    """Milliseconds from launch to each startup milestone.
+
+    The launcher makes one first thing and marks "import" once the game
+    module is loaded; the game marks "window" and "first frame", and
+    shown() marks "shown" on Tk's first idle pass, after the window has
+    been drawn, then logs the report.
+    """
+
+    def __init__(self, clock=time.perf_counter, exit_when_shown=False):
+        self.clock = clock
+        self.t0 = clock()
+        self.marks = []
+        self.exit_when_shown = exit_when_shown
+
+    def mark(self, name):
+        self.marks.append((name, (self.clock() - self.t0) * 1000))
+
+    def shown(self, root):
+        def done():
+            self.mark("shown")
+            logging.getLogger("startup").info("%s", self.report())
+            if self.exit_when_shown:
+                root.destroy()
+        root.after_idle(done)
+
+    def report(self):
+        parts, last = [], 0
+        for name, ms in self.marks:
+            parts.append(f"{name} {ms:.1f} ms (+{ms - last:.1f})")
+            last = ms
+        return ", ".join(parts)
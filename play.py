@@ -0,0 +1,38 @@
+"""Launcher for the games, with a startup-time report.
+
+    python play.py spaceshoot [--threaded] [--image]
+    python play.py neoncube [--threaded] [--image]
+    python play.py neoncube --startup       # report startup times and quit
+
+Startup times are logged in milliseconds from launch to the game module
+being imported, the Tk window existing, the first frame being drawn and
+the window being shown (Tk's first idle pass). The game modules never
+import Tk at import time, so tools that only need the game logic (bench,
+replay, sweep, batchsim) don't pay for it.
+"""
+import importlib
+import sys
+
+from perf import StartupTimer
+
+startup = StartupTimer()      # as early as possible; everything after is timed
+
+GAMES = ("spaceshoot", "neoncube")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in GAMES:
+        print(f"usage: python play.py {{{'|'.join(GAMES)}}} [--image] [--threaded] "
+              "[--startup]", file=sys.stderr)
+        return 2
+
+    game = importlib.import_module(argv[0])
+    startup.mark("import")
+    startup.exit_when_shown = "--startup" in argv
+    game.main(argv[1:], startup)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# ================= CANVAS ITEM POOLS ==================
+class ItemPool:
+    """Reusable canvas items of one shape and style.
+
+    release() hides an item instead of deleting it and acquire() hands
+    hidden items back out, so once the pool has grown to the peak number
+    of live items no more items are created.
+    """
+
+    def __init__(self, canvas, kind, **options):
+        self.canvas = canvas
+        self.kind = kind
+        self.options = options
+        self.create = getattr(canvas, "create_" + kind)
+        self.items = []         # every item made, shown or hidden
+        self.free = []
+
+        self.live = 0
+        self.hits = 0
+        self.misses = 0
+        self.high_water = 0
+
+    def acquire(self, *coords, **options):
+        """A shown item at coords; options are applied on top of the pool's."""
+        if self.free:
+            item = self.free.pop()
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfig(item, state="normal", **options)
+            self.hits += 1
+        else:
+            item = self.create(*coords, **self.options, **options)
+            self.items.append(item)
+            self.misses += 1
+
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return item
+
+    def configure(self, **options):
+        """Change the pool's options, on its items shown or hidden too."""
+        self.options.update(options)
+        for item in self.items:
+            self.canvas.itemconfig(item, **options)
+
+    def release(self, item):
+        self.canvas.itemconfig(item, state="hidden")
+        self.free.append(item)
+        self.live -= 1
+
+    def stats(self):
+        return {
+            "live": self.live,
+            "free": len(self.free),
+            "hits": self.hits,
+            "misses": self.misses,
+            "high_water": self.high_water,
+        }
+
+
+class PoolSet:
+    """One ItemPool per (shape, style), created on first use.
+
+    A pool given a `name` is keyed by it instead of its style, so it can
+    be restyled with configure() and still be found.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.pools = {}
+
+    def get(self, kind, name=None, **options):
+        key = (kind, tuple(sorted(options.items())) if name is None else name)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = ItemPool(self.canvas, kind, **options)
+        return pool
+
+    def stats(self):
+        total = {"live": 0, "free": 0, "hits": 0, "misses": 0, "high_water": 0}
+        for pool in self.pools.values():
+            for name, value in pool.stats().items():
+                total[name] += value
+        return total
@@ -0,0 +1,62 @@
+import logging
+from collections import deque
+
+from perf import percentile
+
+log = logging.getLogger("quality")
+
+
+# ================= QUALITY GOVERNOR ==================
+class QualityGovernor:
+    """Sheds cosmetic load in steps when frames overrun the budget.
+
+    `levels` runs from full quality (levels[0]) down; apply(settings) is
+    called with the new level's settings on every change. sample() takes
+    the work time of each frame. Once `window` samples have come in, the
+    governor steps down a level if their p90 is above `down` x budget, or
+    up a level if it is below `up` x budget. The gap between the two
+    thresholds, a fresh window after every change and `hold` frames
+    before the next one keep it from flapping between two levels.
+    Every change is logged and kept in `decisions`.
+    """
+
+    def __init__(self, levels, apply, budget_ms=16, window=60,
+                 down=0.9, up=0.5, hold=120, name="quality"):
+        self.levels = levels
+        self.apply = apply
+        self.budget_ms = budget_ms
+        self.window = window
+        self.down = down
+        self.up = up
+        self.hold = hold
+        self.name = name
+
+        self.level = 0
+        self.times = deque(maxlen=window)
+        self.frame = 0
+        self.changed_at = -hold
+        self.decisions = []
+
+    def sample(self, work_ms):
+        self.frame += 1
+        self.times.append(work_ms)
+        if len(self.times) < self.window or self.frame - self.changed_at < self.hold:
+            return
+
+        p90 = percentile(self.times, 90)
+        if p90 > self.budget_ms * self.down and self.level < len(self.levels) - 1:
+            self.set_level(self.level + 1, p90, "overrun")
+        elif p90 < self.budget_ms * self.up and self.level > 0:
+            self.set_level(self.level - 1, p90, "headroom")
+
+    def set_level(self, level, p90=None, reason="manual"):
+        decision = {"frame": self.frame, "from": self.level, "to": level,
+                    "p90_ms": None if p90 is None else round(p90, 2), "reason": reason}
+        self.decisions.append(decision)
+        log.info("%s: level %d -> %d (%s, p90 %s ms)", self.name,
+                 self.level, level, reason, decision["p90_ms"])
+
+        self.level = level
+        self.changed_at = self.frame
+        self.times.clear()
+        self.apply(self.levels[level])
@@ -0,0 +1,462 @@
+"""Render backends: Canvas items, or one composited image per frame.
+
+Both games draw through `renderer.surface`, which has the Canvas item
+API they use (create_*, coords, move, itemconfig, delete, tag_raise,
+find_all), and call `renderer.present()` once per frame.
+
+CanvasRenderer hands out the Tk canvas itself. ImageRenderer hands out a
+Compositor that keeps the items in Python and rasterizes them with NumPy
+into one RGB frame, shown as a single PhotoImage. Changed items mark the
+TILE x TILE tiles under their old and new bounding boxes dirty; present()
+redraws only dirty tiles and sends each dirty run to Tk as one PPM put,
+so a frame costs a handful of Tk calls however many items moved. Text
+stays on the real canvas, above the frame.
+"""
+import numpy as np
+
+TILE = 32
+
+NAMED_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0),
+    "green": (0, 128, 0), "blue": (0, 0, 255), "yellow": (255, 255, 0),
+    "orange": (255, 165, 0), "purple": (160, 32, 240), "gray": (190, 190, 190),
+}
+
+# Tk stipple bitmaps as (period, pixels set within one period)
+STIPPLES = {
+    "gray12": (4, ((0, 0), (2, 2))),
+    "gray25": (2, ((0, 0),)),
+    "gray50": (2, ((0, 0), (1, 1))),
+    "gray75": (2, ((0, 0), (0, 1), (1, 1))),
+}
+
+
+# ================= BACKENDS ==================
+class CanvasRenderer:
+    """Every item is a Tk canvas item; Tk redraws what changed."""
+
+    def __init__(self, canvas, width, height, bg, make_image):
+        self.surface = canvas
+        self.make_image = make_image
+
+    def present(self):
+        pass
+
+
+class ImageRenderer:
+    """Items are composited into one image; make_image gives ArrayImages."""
+
+    def __init__(self, canvas, width, height, bg, make_image):
+        self.surface = Compositor(canvas, width, height, bg, make_image)
+        self.make_image = ArrayImage
+
+    def present(self):
+        self.surface.present()
+
+
+RENDERERS = {"canvas": CanvasRenderer, "image": ImageRenderer}
+
+
+# ================= IMAGES ==================
+class ArrayImage:
+    """PhotoImage stand-in backed by NumPy, for ParallaxLayer-style painting."""
+
+    def __init__(self, width, height):
+        self.rgb = np.zeros((height, width, 3), dtype=np.uint8)
+        self.opaque = np.zeros((height, width), dtype=bool)
+        self.alpha = None       # per-pixel alpha once put_rgba() is used
+
+    def width(self):
+        return self.rgb.shape[1]
+
+    def height(self):
+        return self.rgb.shape[0]
+
+    def put(self, color, to=None):
+        x1, y1, x2, y2 = to or (0, 0, self.width(), self.height())
+        self.rgb[y1:y2, x1:x2] = parse_color(color)
+        self.opaque[y1:y2, x1:x2] = True
+
+    def put_rgba(self, rgba):
+        a = rgba[..., 3]
+        self.rgb[:] = rgba[..., :3]
+        self.opaque[:] = a > 0
+        # only blend images that have partly transparent pixels
+        soft = (a > 0) & (a < 255)
+        self.alpha = a[..., None].astype(np.uint32) if soft.any() else None
+
+    def blank(self):
+        self.opaque[:] = False
+        self.alpha = None
+
+
+_color_cache = {}
+
+
+def parse_color(color, canvas=None):
+    """"#rgb", "#rrggbb" or a color name -> (r, g, b); "" -> None."""
+    if not color:
+        return None
+    rgb = _color_cache.get(color)
+    if rgb is None:
+        if color[0] == "#":
+            digits = color[1:]
+            n = len(digits) // 3
+            rgb = tuple(int(digits[i*n:(i+1)*n], 16) * 255 // (16**n - 1)
+                        for i in range(3))
+        elif color.lower() in NAMED_COLORS:
+            rgb = NAMED_COLORS[color.lower()]
+        elif hasattr(canvas, "winfo_rgb"):
+            rgb = tuple(c >> 8 for c in canvas.winfo_rgb(color))
+        else:
+            raise ValueError(f"unknown color {color!r}")
+        _color_cache[color] = rgb
+    return rgb
+
+
+# ================= COMPOSITOR ==================
+class Item:
+    __slots__ = ("kind", "coords", "tags", "state", "fill", "outline", "width",
+                 "stipple", "image", "real", "bbox", "origin", "key")
+
+    def __init__(self, kind, coords, tags):
+        self.kind = kind
+        self.coords = coords
+        self.tags = tags
+        self.state = "normal"
+        self.fill = None
+        self.outline = None
+        self.width = 1
+        self.stipple = None
+        self.image = None
+        self.real = None        # canvas item id of a text item
+        self.bbox = (0, 0, 0, 0)
+        self.origin = (0, 0)    # top-left of the (unclipped) mask
+        self.key = None         # MASKS key, or the image for image items
+
+
+class Compositor:
+    def __init__(self, canvas, width, height, bg, make_image):
+        self.canvas = canvas
+        self.w = width
+        self.h = height
+        self.bg = parse_color(bg, canvas)
+
+        self.items = {}         # id -> Item, in stacking order
+        self.next_id = 1
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        self.frame[:] = self.bg
+        self.dirty = np.zeros((-(-height // TILE), -(-width // TILE)), dtype=bool)
+
+        self.photo = make_image(width, height)
+        self.canvas.create_image(0, 0, image=self.photo, anchor="nw")
+        self.puts = 0
+
+    # ---- canvas API
+    def pack(self, *args, **options):
+        pass
+
+    def create_rectangle(self, *args, **options):
+        return self._create("rectangle", args, options)
+
+    def create_oval(self, *args, **options):
+        return self._create("oval", args, options)
+
+    def create_polygon(self, *args, **options):
+        return self._create("polygon", args, options)
+
+    def create_image(self, *args, **options):
+        return self._create("image", args, options)
+
+    def create_text(self, *args, **options):
+        item_id = self._create("text", args, options)
+        self.items[item_id].real = self.canvas.create_text(*args, **options)
+        return item_id
+
+    def coords(self, tag_or_id, *args):
+        ids = self._ids(tag_or_id)
+        if not args:
+            return list(self.items[ids[0]].coords) if ids else []
+        coords = list(args[0]) if len(args) == 1 else list(args)
+        for i in ids[:1]:
+            item = self.items[i]
+            if item.real is not None:
+                self.canvas.coords(item.real, *coords)
+                continue
+            item.coords = coords
+            self._changed(item)
+
+    def move(self, tag_or_id, dx, dy):
+        for i in self._ids(tag_or_id):
+            item = self.items[i]
+            if item.real is not None:
+                self.canvas.move(item.real, dx, dy)
+                continue
+            c = item.coords
+            for j in range(0, len(c) - 1, 2):
+                c[j] += dx
+                c[j + 1] += dy
+            self._changed(item)
+
+    def itemconfig(self, tag_or_id, **options):
+        for i in self._ids(tag_or_id):
+            item = self.items[i]
+            if item.real is not None:
+                self.canvas.itemconfig(item.real, **options)
+                continue
+            self._configure(item, options)
+            self._changed(item, force=True)
+
+    itemconfigure = itemconfig
+
+    def delete(self, *tags_or_ids):
+        for t in tags_or_ids:
+            for i in self._ids(t):
+                item = self.items.pop(i)
+                if item.real is not None:
+                    self.canvas.delete(item.real)
+                else:
+                    self._mark(item.bbox)
+
+    def tag_raise(self, tag_or_id):
+        for i in self._ids(tag_or_id):
+            item = self.items.pop(i)
+            self.items[i] = item
+            if item.real is not None:
+                self.canvas.tag_raise(item.real)
+            else:
+                self._mark(item.bbox)
+
+    def find_all(self):
+        return tuple(self.items)
+
+    # ---- bookkeeping
+    def _ids(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        if tag_or_id == "all":
+            return list(self.items)
+        return [i for i, item in self.items.items() if tag_or_id in item.tags]
+
+    def _create(self, kind, args, options):
+        coords = list(args[0]) if len(args) == 1 else list(args)
+        tags = options.get("tags", options.get("tag", ()))
+        item = Item(kind, coords, {tags} if isinstance(tags, str) else set(tags))
+        if kind != "text":
+            self._configure(item, options)
+            self._changed(item, force=True)
+        item_id = self.next_id
+        self.next_id += 1
+        self.items[item_id] = item
+        return item_id
+
+    def _configure(self, item, options):
+        if "state" in options:
+            item.state = options["state"]
+        if "fill" in options:
+            item.fill = parse_color(options["fill"], self.canvas)
+        if "outline" in options:
+            item.outline = parse_color(options["outline"], self.canvas)
+        if "width" in options:
+            item.width = options["width"]
+        if "stipple" in options:
+            item.stipple = options["stipple"] or None
+        if "image" in options:
+            item.image = options["image"]
+
+    def _changed(self, item, force=False):
+        # shapes snap to whole pixels, so a sub-pixel move that rounds to
+        # the same place (slow stars, parallax strips) costs nothing
+        c = item.coords
+        kind = item.kind
+        if kind == "image":
+            key = item.image
+            x1, y1 = int(round(c[0])), int(round(c[1]))
+            x2, y2 = x1 + key.width(), y1 + key.height()
+        else:
+            pad = -(-item.width // 2) if item.outline else 0
+            line = item.outline is not None and item.width
+            if len(c) == 4:
+                # rectangles and ovals: the common, cheap case
+                ax, bx = sorted((int(round(c[0])), int(round(c[2]))))
+                ay, by = sorted((int(round(c[1])), int(round(c[3]))))
+                x1, y1, x2, y2 = ax - pad, ay - pad, bx + pad, by + pad
+                key = (kind, (pad, bx - x1), (pad, by - y1), item.fill is not None, line)
+            else:
+                xs = [int(round(v)) for v in c[0::2]]
+                ys = [int(round(v)) for v in c[1::2]]
+                x1, y1 = min(xs) - pad, min(ys) - pad
+                x2, y2 = max(xs) + pad, max(ys) + pad
+                key = (kind, tuple(v - x1 for v in xs), tuple(v - y1 for v in ys),
+                       item.fill is not None, line)
+
+        bbox = (max(0, x1), max(0, y1), min(self.w, x2), min(self.h, y2))
+        if not force and bbox == item.bbox and key == item.key and item.origin == (x1, y1):
+            return
+        self._mark(item.bbox)
+        item.bbox = bbox
+        item.origin = (x1, y1)
+        item.key = key
+        self._mark(bbox)
+
+    def _mark(self, box):
+        x1, y1, x2, y2 = box
+        if x1 < x2 and y1 < y2:
+            self.dirty[y1 // TILE:(y2 - 1) // TILE + 1, x1 // TILE:(x2 - 1) // TILE + 1] = True
+
+    # ---- compositing
+    def present(self):
+        rects = self._cover()
+        if not rects:
+            return
+
+        items = [item for item in self.items.values()
+                 if item.state != "hidden" and item.real is None]
+        boxes = np.array([item.bbox for item in items], dtype=np.int32).reshape(-1, 4)
+        frame = self.frame
+
+        for x1, y1, x2, y2 in rects:
+            frame[y1:y2, x1:x2] = self.bg
+            hit = np.flatnonzero((boxes[:, 0] < x2) & (boxes[:, 2] > x1) &
+                                 (boxes[:, 1] < y2) & (boxes[:, 3] > y1))
+            for i in hit.tolist():
+                self._draw(items[i], x1, y1, x2, y2)
+
+            region = np.ascontiguousarray(frame[y1:y2, x1:x2])
+            header = b"P6 %d %d 255\n" % (x2 - x1, y2 - y1)
+            self.photo.put(header + region.tobytes(), to=(x1, y1))
+            self.puts += 1
+
+    def _cover(self):
+        """Cover the dirty tiles with rectangles and clear them.
+
+        Runs along a tile row grow downwards while the rows below have
+        the same run dirty.
+        """
+        todo = self.dirty
+        rows, cols = todo.shape
+        rects = []
+        for ty in np.flatnonzero(todo.any(axis=1)).tolist():
+            tx = 0
+            while tx < cols:
+                if not todo[ty, tx]:
+                    tx += 1
+                    continue
+                end = tx
+                while end < cols and todo[ty, end]:
+                    end += 1
+                bottom = ty + 1
+                while bottom < rows and todo[bottom, tx:end].all():
+                    bottom += 1
+                todo[ty:bottom, tx:end] = False
+                rects.append((tx * TILE, ty * TILE,
+                              min(self.w, end * TILE), min(self.h, bottom * TILE)))
+                tx = end
+        return rects
+
+    def _draw(self, item, cx1, cy1, cx2, cy2):
+        bx1, by1, bx2, by2 = item.bbox
+        x1, y1 = max(bx1, cx1), max(by1, cy1)
+        x2, y2 = min(bx2, cx2), min(by2, cy2)
+        dst = self.frame[y1:y2, x1:x2]
+        ox, oy = item.origin
+        sl = (slice(y1 - oy, y2 - oy), slice(x1 - ox, x2 - ox))
+
+        if item.kind == "image":
+            img = item.image
+            if img.alpha is None:
+                np.copyto(dst, img.rgb[sl], where=img.opaque[sl][..., None])
+            else:
+                a = img.alpha[sl]
+                np.copyto(dst, (img.rgb[sl] * a + dst * (255 - a) + 127) // 255,
+                          casting="unsafe")
+            return
+
+        fill, line = shape_masks(item.key)
+        if item.stipple in STIPPLES:
+            pattern = stipple_mask(item.stipple, x1, y1, x2, y2)
+            fill = fill[sl] & pattern if fill is not None else None
+            line = line[sl] & pattern if line is not None else None
+        else:
+            fill = fill[sl] if fill is not None else None
+            line = line[sl] if line is not None else None
+
+        if fill is not None:
+            np.copyto(dst, item.fill, where=fill[..., None], casting="unsafe")
+        if line is not None:
+            np.copyto(dst, item.outline, where=line[..., None], casting="unsafe")
+
+
+# ================= SHAPE MASKS ==================
+# Masks depend only on a shape's pixel-snapped size and outline, so
+# same-shaped items (every enemy, every particle of one size) share them.
+MASKS = {}
+MAX_MASKS = 4096
+
+
+def shape_masks(key):
+    masks = MASKS.get(key)
+    if masks is None:
+        if len(MASKS) >= MAX_MASKS:
+            MASKS.clear()
+        kind, xs, ys, filled, width = key
+        h, w = max(ys) + (-(-width // 2) if width else 0), max(xs) + (-(-width // 2) if width else 0)
+        py = np.arange(h, dtype=float)[:, None] + 0.5
+        px = np.arange(w, dtype=float)[None, :] + 0.5
+        coords = [v for xy in zip(xs, ys) for v in xy]
+        shape = SHAPES[kind]
+        fill = shape(coords, px, py, 0) if filled else None
+        line = None
+        if width:
+            line = shape(coords, px, py, width / 2) & ~shape(coords, px, py, -width / 2)
+        masks = MASKS[key] = (fill, line)
+    return masks
+
+
+def stipple_mask(name, x1, y1, x2, y2):
+    period, cells = STIPPLES[name]
+    pattern = np.zeros((y2 - y1, x2 - x1), dtype=bool)
+    for cy, cx in cells:
+        pattern[(cy - y1) % period::period, (cx - x1) % period::period] = True
+    return pattern
+
+
+def rect_mask(c, px, py, grow):
+    x1, y1, x2, y2 = min(c[0], c[2]), min(c[1], c[3]), max(c[0], c[2]), max(c[1], c[3])
+    return ((px >= x1 - grow) & (px < x2 + grow)) & ((py >= y1 - grow) & (py < y2 + grow))
+
+
+def oval_mask(c, px, py, grow):
+    rx = abs(c[2] - c[0]) / 2 + grow
+    ry = abs(c[3] - c[1]) / 2 + grow
+    if rx <= 0 or ry <= 0:
+        return np.zeros(np.broadcast(px, py).shape, dtype=bool)
+    cx, cy = (c[0] + c[2]) / 2, (c[1] + c[3]) / 2
+    return ((px - cx) / rx) ** 2 + ((py - cy) / ry) ** 2 <= 1
+
+
+def polygon_mask(c, px, py, grow):
+    # even-odd fill, then +/- a band of width |grow| along the edges
+    xs, ys = c[0::2], c[1::2]
+    n = len(xs)
+    inside = np.zeros(np.broadcast(px, py).shape, dtype=bool)
+    near = np.zeros_like(inside) if grow else None
+    for i in range(n):
+        x0, y0, x1, y1 = xs[i], ys[i], xs[(i + 1) % n], ys[(i + 1) % n]
+        if y0 != y1:
+            crosses = (y0 > py) != (y1 > py)
+            xcross = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+            inside ^= crosses & (px < xcross)
+        if grow:
+            dx, dy = x1 - x0, y1 - y0
+            length2 = dx * dx + dy * dy or 1
+            t = np.clip(((px - x0) * dx + (py - y0) * dy) / length2, 0, 1)
+            near |= (px - x0 - t * dx) ** 2 + (py - y0 - t * dy) ** 2 <= grow * grow
+    if grow > 0:
+        return inside | near
+    if grow < 0:
+        return inside & ~near
+    return inside
+
+
+SHAPES = {"rectangle": rect_mask, "oval": oval_mask, "polygon": polygon_mask}
@@ -0,0 +1,265 @@
+"""Highscores and run history, written off the game thread.
+
+Every finished run is appended to a JSON-lines run log and fsync'd, so
+history survives a crash. Every `compact_every` runs the leaderboard is
+folded into a snapshot file, written to a temp file and renamed over the
+old one, and the runs it covers move from the log to the end of a history
+file, which keeps every run ever recorded. Each run carries a sequence
+number; the snapshot records the last one it includes and the history
+ends with the last one it holds, so a crash part-way through a compaction
+never counts or archives a run twice. A torn last line is skipped. With
+`ghost_path` set, the binary recording of each new best run is written
+there, replacing the previous best's (see ghost.py).
+
+All disk reads and writes happen on a background thread, which loads the
+files before anything else, so opening a store never waits on the disk;
+`loaded` is set once the leaderboard is in. Nothing waits for it:
+record() updates the in-memory leaderboard and returns without waiting
+on writes, and runs recorded while the store is still loading are held
+back and added, and written, as soon as the load is in.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from bisect import insort
+
+log = logging.getLogger("scores")
+
+
+def atomic_write(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ================= SCORE STORE ==================
+class ScoreStore:
+    """Leaderboard backed by a snapshot file and a run log, with every
+    compacted run kept in a history file.
+
+    With no paths it keeps everything in memory (headless runs).
+    """
+
+    def __init__(self, snapshot_path=None, log_path=None, keep=100, compact_every=50,
+                 ghost_path=None, history_path=None):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        if history_path is None and log_path:
+            history_path = os.path.splitext(log_path)[0] + ".history.jsonl"
+        self.history_path = history_path
+        self.ghost_path = ghost_path
+        self.keep = keep
+        self.compact_every = compact_every
+
+        self.board = []         # (-score, seq, run), best first
+        self.highscore = 0
+        self.runs = 0           # runs ever recorded
+        self.seq = 0            # last sequence number handed out
+        self.compacted = 0      # last seq folded into the snapshot
+        self.archived = 0       # last seq moved to the history (writer thread)
+
+        self.queue = queue.Queue()
+        self.loaded = threading.Event()
+        self.lock = threading.Lock()
+        self.pending = None     # runs recorded while loading, or None once loaded
+        self.thread = None
+        if snapshot_path or log_path:
+            self.pending = []
+            self.thread = threading.Thread(target=self.writer, name="scores", daemon=True)
+            self.thread.start()
+        else:
+            self.loaded.set()
+
+    # ---- reading
+    def load(self):
+        try:
+            with open(self.snapshot_path) as f:
+                snap = json.load(f)
+        except FileNotFoundError:
+            snap = {}
+        except (OSError, ValueError) as e:
+            log.warning("ignoring unreadable %s: %s", self.snapshot_path, e)
+            snap = {}
+
+        # the original format was just {"highscore": n}
+        self.highscore = snap.get("highscore", 0)
+        self.runs = snap.get("runs", 0)
+        self.seq = self.compacted = snap.get("seq", 0)
+        for run in snap.get("top", []):
+            self.index(run)
+
+        runs, torn = self.read_log()
+        for run in runs:
+            if run["seq"] > self.compacted:
+                self.add(run)
+        if torn:
+            # drop the torn tail so the next append starts on a fresh line
+            self.rewrite_log(runs)
+        if self.history_path:
+            self.archived = self.read_history_tail()
+
+    def read_log(self):
+        """(runs, whether a torn record was skipped)."""
+        try:
+            with open(self.log_path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return [], False
+        except OSError as e:
+            log.warning("ignoring unreadable %s: %s", self.log_path, e)
+            return [], False
+
+        runs, torn = [], False
+        for n, line in enumerate(lines, 1):
+            try:
+                runs.append(json.loads(line))
+            except ValueError:
+                log.warning("%s:%d: skipping torn record", self.log_path, n)
+                torn = True
+        return runs, torn
+
+    def read_history_tail(self):
+        """Last seq in the history file, reading only its end.
+
+        A torn last line is cut off so the next append starts on a fresh one.
+        """
+        try:
+            with open(self.history_path, "rb+") as f:
+                end = f.seek(0, os.SEEK_END)
+                start = f.seek(max(0, end - 4096))
+                tail = f.read()
+                cut = tail.rfind(b"\n") + 1
+                if cut < len(tail):
+                    log.warning("%s: dropping torn record", self.history_path)
+                    f.truncate(start + cut)
+        except FileNotFoundError:
+            return 0
+        lines = tail[:cut].splitlines()
+        return json.loads(lines[-1])["seq"] if lines else 0
+
+    def top(self, n=10):
+        """The best n runs; only those read so far until `loaded` is set."""
+        return [run for _, _, run in self.board[:n]]
+
+    # ---- recording
+    def index(self, run):
+        insort(self.board, (-run["score"], run["seq"], run))
+        del self.board[self.keep:]
+
+    def add(self, run):
+        self.seq = max(self.seq, run["seq"])
+        self.runs += 1
+        self.highscore = max(self.highscore, run["score"])
+        self.index(run)
+
+    def record(self, score, duration_ms, seed, recording=None):
+        """Add a finished run; the write happens in the background.
+
+        Returns whether the run is the new best, or None while the store
+        is still loading: the run is then added once the load is in. The
+        new best tops the board and scores at least the highscore before
+        it, which an old {"highscore": n} file holds with no board.
+        `recording` (bytes) is saved to ghost_path if the run is the new
+        best, decided by that same result.
+        """
+        run = {"seq": None, "score": score, "duration_ms": duration_ms,
+               "seed": seed, "time": round(time.time())}
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((run, recording))
+                return None
+            best, jobs = self.enter(run, recording)
+            for job in jobs:
+                self.queue.put(job)
+        return best
+
+    def enter(self, run, recording):
+        """Number and add a new run; (whether it's the new best, writes it needs)."""
+        run["seq"] = self.seq + 1
+        beaten = self.highscore
+        self.add(run)
+        best = self.board[0][2] is run and run["score"] >= beaten
+        if self.thread is None:
+            return best, []
+
+        jobs = [("append", run)]
+        if best and recording is not None and self.ghost_path:
+            jobs.append(("ghost", recording))
+        if self.seq - self.compacted >= self.compact_every:
+            self.compacted = self.seq
+            jobs.append(("compact", {
+                "highscore": self.highscore,
+                "runs": self.runs,
+                "seq": self.seq,
+                "top": self.top(self.keep),
+            }))
+        return best, jobs
+
+    def close(self):
+        """Finish pending writes."""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    # ---- writer thread
+    def writer(self):
+        try:
+            self.load()
+        except Exception:
+            log.exception("loading scores failed")
+        # runs recorded while loading; written here, ahead of anything
+        # queued, and before `loaded` lets the game map the ghost file
+        with self.lock:
+            pending, self.pending = self.pending, None
+            jobs = [job for run, recording in pending for job in self.enter(run, recording)[1]]
+        for job in jobs:
+            self.do(job)
+        self.loaded.set()
+
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            self.do(job)
+
+    def do(self, job):
+        kind, data = job
+        try:
+            if kind == "append":
+                self.append(data)
+            elif kind == "ghost":
+                atomic_write(self.ghost_path, data)
+            else:
+                self.compact(data)
+        except OSError as e:
+            log.error("%s failed: %s", kind, e)
+
+    def append(self, run):
+        with open(self.log_path, "a") as f:
+            f.write(json.dumps(run) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self, snap):
+        # history first: until the log is rewritten, its runs are still there
+        runs, _ = self.read_log()
+        done = [run for run in runs if self.archived < run["seq"] <= snap["seq"]]
+        if done:
+            with open(self.history_path, "a") as f:
+                f.write("".join(json.dumps(run) + "\n" for run in done))
+                f.flush()
+                os.fsync(f.fileno())
+            self.archived = done[-1]["seq"]
+        atomic_write(self.snapshot_path, json.dumps(snap))
+        # keep runs appended after this snapshot was taken
+        self.rewrite_log([run for run in runs if run["seq"] > snap["seq"]])
+
+    def rewrite_log(self, runs):
+        atomic_write(self.log_path, "".join(json.dumps(run) + "\n" for run in runs))
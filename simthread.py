@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+
+from gameloop import FixedStepLoop
+
+
+# ================= SIMULATION THREAD ==================
+class SimThread:
+    """Runs step() on a worker thread at a fixed rate.
+
+    After each batch of steps the worker calls snapshot() and publishes
+    the result into one of two buffers, then flips `front` to it; the Tk
+    thread only ever reads the front buffer through latest(). Snapshots
+    must not be changed once published, so neither side needs a lock.
+
+    Inputs go the other way through a deque (append and popleft are
+    atomic): the Tk thread send()s, and step() receives everything sent
+    since the previous step as a list. Pacing works like FixedStepLoop:
+    at most max_steps per wake-up, any backlog beyond that is dropped.
+    """
+
+    def __init__(self, step, snapshot, step_ms=16, max_steps=5,
+                 clock=time.perf_counter):
+        self.step = step
+        self.snapshot = snapshot
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.clock = clock
+
+        self.inputs = deque()
+        self.buffers = [None, None]     # (snapshot, publish time)
+        self.front = 0
+
+        self.running = False
+        self.thread = None
+        self.steps = 0
+        self.dropped_ms = 0
+
+    def start(self):
+        self.running = True
+        self.publish()
+        self.thread = threading.Thread(target=self.run, name="sim", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def send(self, value):
+        self.inputs.append(value)
+
+    def latest(self):
+        """(newest snapshot, clock time it was published)."""
+        return self.buffers[self.front]
+
+    def alpha(self, published):
+        """How far the clock is past a snapshot, in steps, for interpolation."""
+        return min(1.0, (self.clock() - published) * 1000 / self.step_ms)
+
+    def publish(self):
+        back = 1 - self.front
+        self.buffers[back] = (self.snapshot(), self.clock())
+        self.front = back
+
+    def drain(self):
+        inputs = self.inputs
+        events = []
+        while inputs:
+            events.append(inputs.popleft())
+        return events
+
+    def run(self):
+        step_s = self.step_ms / 1000
+        due = self.clock() + step_s
+        while self.running:
+            now = self.clock()
+            steps = 0
+            while now >= due and steps < self.max_steps and self.running:
+                self.step(self.drain())
+                self.steps += 1
+                steps += 1
+                due += step_s
+
+            if now >= due:
+                # too far behind: drop the backlog instead of spiralling
+                self.dropped_ms += (now - due) * 1000
+                due = now + step_s
+
+            if steps:
+                self.publish()
+            time.sleep(max(0.0, due - self.clock()))
+
+
+# ================= DRIVER ==================
+class Driver:
+    """Steps a game's World and draws it, on the Tk thread or a SimThread.
+
+    The game hands over its inputs with send(); step(events) is called
+    once per simulation step with everything sent since the step before,
+    and render(alpha, view) draws `view`: the World itself, or with
+    threaded=True the newest snapshot the worker published. Either way
+    the game's stepping and drawing code is the same. Anything else that
+    changes the World goes through call().
+
+    The profiler isn't thread-safe: give the World `world_profiler`,
+    which is None when the World steps on the worker.
+    """
+
+    def __init__(self, root, step, render, step_ms, profiler, threaded=False):
+        self.step = step
+        self.render = render
+        self.world_profiler = None if threaded else profiler
+        self.world = None
+        self.events = []
+        self.calls = deque()
+
+        self.sim = None
+        if threaded:
+            self.sim = SimThread(self.worker_step, self.snapshot, step_ms)
+            # the worker owns the World; this loop only paces rendering
+            self.loop = FixedStepLoop(root, lambda: None, self.present, step_ms,
+                                      profiler=profiler)
+        else:
+            self.loop = FixedStepLoop(root, self.tick, render, step_ms,
+                                      profiler=profiler)
+
+    def start(self, world):
+        """Step `world` from now on; the first frame is drawn before this returns."""
+        self.world = world
+        if self.sim:
+            self.sim.start()
+        self.loop.start()
+
+    def stop(self):
+        self.loop.stop()
+        if self.sim:
+            self.sim.stop()
+
+    def send(self, value):
+        if self.sim:
+            self.sim.send(value)
+        else:
+            self.events.append(value)
+
+    def call(self, fn, *args):
+        """Run fn(*args) where the World steps: now, or on the worker before its next step."""
+        if self.sim:
+            self.calls.append((fn, args))
+        else:
+            fn(*args)
+
+    def latest(self):
+        """What the screen shows: the World, or its newest snapshot if threaded."""
+        return self.world if self.sim is None else self.sim.latest()[0]
+
+    def snapshot(self):
+        return self.world.snapshot()
+
+    def tick(self):
+        events, self.events = self.events, []
+        self.step(events)
+
+    def worker_step(self, events):
+        calls = self.calls
+        while calls:
+            fn, args = calls.popleft()
+            fn(*args)
+        self.step(events)
+
+    def present(self, alpha):
+        snap, published = self.sim.latest()
+        self.render(self.sim.alpha(published), snap)
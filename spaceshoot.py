@@ -1,66 +1,151 @@
-import tkinter as tk
+import logging
 import random
+import sys
+from copy import copy
+
+import numpy as np
+
+from collision import SpatialHash, mask_hit, polygon_mask, rect_mask
+from entities import EntityStore
+from gameloop import lerp
+from hud import Hud
+from particles import ParticleSystem
+from perf import FrameProfiler, PerfOverlay
+from pool import PoolSet
+from quality import QualityGovernor
+from render import RENDERERS
+from replay import InputLog, checksum, derive_seed, new_seed
+from simthread import Driver
+from sprites import Sprite, SpriteCache
+from starfield import Starfield
+from timers import Scheduler
 
 WIDTH = 600
 HEIGHT = 700
+FRAME_MS = 16
 
-# ================= PARTICLE CLASS ==================
-class Particle:
-    def __init__(self, canvas, x, y, color, size=4):
-        self.canvas = canvas
-        self.id = canvas.create_oval(x, y, x+size, y+size, fill=color, outline="")
-        self.dx = random.uniform(-1.2, 1.2)
-        self.dy = random.uniform(-2, 1)
-        self.life = random.randint(8, 15)
+BOSS_SCORE = 10
+BOSS_HEALTH = 25
+PARTICLE_CAP = 400
+SPRITE_DIR = "sprite_cache"
 
-    def update(self):
-        self.canvas.move(self.id, self.dx, self.dy)
-        self.dy += 0.05
-        self.life -= 1
-        return self.life > 0
+# cosmetic load per quality level, full quality first
+QUALITY = (
+    {"particles": 400, "explosion": 25, "engine_every": 1, "stars": 80},
+    {"particles": 250, "explosion": 16, "engine_every": 2, "stars": 60},
+    {"particles": 120, "explosion": 8, "engine_every": 4, "stars": 40},
+    {"particles": 60, "explosion": 4, "engine_every": 0, "stars": 20},
+)
 
+# ================= INPUT ==================
+class Inputs:
+    FIELDS = ("left", "right", "up", "down", "shoot")
 
-# ================= GAME CLASS ==================
-class Game:
     def __init__(self):
-        self.win = tk.Tk()
-        self.win.title("Galaxy Shooter — FIXED VERSION")
+        self.left = False
+        self.right = False
+        self.up = False
+        self.down = False
+        self.shoot = False
+
+    def bits(self):
+        return sum(1 << i for i, name in enumerate(self.FIELDS) if getattr(self, name))
+
+    @classmethod
+    def from_bits(cls, bits):
+        inputs = cls()
+        for i, name in enumerate(cls.FIELDS):
+            setattr(inputs, name, bool(bits & (1 << i)))
+        return inputs
+
+
+# ================= WORLD OBJECTS ==================
+# Plain model objects: positions live here, never in the canvas.
+# Speeds are in pixels per 16 ms frame, scaled by k = dt / FRAME_MS.
+# px/py hold the position before the last step, for render interpolation.
+# `mask` is the shape's collision bitmask, placed at origin().
+class Bullet:
+    mask = rect_mask(6, 25)
+
+    def __init__(self, x, y):
+        self.handle = None
+        self.x = self.px = x    # center
+        self.y = self.py = y    # top edge
+
+    def box(self):
+        return self.shape(self.x, self.y)
+
+    def origin(self):
+        return round(self.x) - 3, round(self.y)
+
+    def shape(self, x, y):
+        return x-3, y, x+3, y+25
 
-        self.canvas = tk.Canvas(self.win, width=WIDTH, height=HEIGHT, bg="#010009")
-        self.canvas.pack()
 
-        # Movement flags
-        self.move_left = False
-        self.move_right = False
-        self.move_up = False
-        self.move_down = False
-        self.shooting = False
+class Enemy:
+    mask = polygon_mask(((22, 0), (0, 40), (44, 40)))
 
-        # Player
+    def __init__(self, x, y):
+        self.handle = None
+        self.x = self.px = x    # centroid
+        self.y = self.py = y
+
+    def box(self):
+        return self.x-22, self.y-27, self.x+22, self.y+13
+
+    def origin(self):
+        return round(self.x) - 22, round(self.y) - 27
+
+
+class Boss:
+    def __init__(self, x1, y1, x2, y2, health):
+        self.handle = 0
+        self.x = self.px = x1
+        self.y = self.py = y1
+        self.w = x2 - x1
+        self.h = y2 - y1
+        self.health = health
+        self.mask = rect_mask(self.w, self.h)
+
+    def box(self):
+        return self.shape(self.x, self.y)
+
+    def origin(self):
+        return round(self.x), round(self.y)
+
+    def shape(self, x, y):
+        return x, y, x+self.w, y+self.h
+
+
+# ================= WORLD ==================
+class World:
+    def __init__(self, profiler=None, seed=None):
+        self.profiler = profiler or FrameProfiler(enabled=False)
+
+        # gameplay and cosmetic randomness come from separate streams, so
+        # effects can change without breaking recorded replays
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.fx_rng = random.Random(derive_seed(self.seed, "fx"))
+
+        # Player (centroid of the ship body)
         self.player_x = WIDTH // 2
         self.player_y = 620
+        self.prev_x = self.player_x
+        self.prev_y = self.player_y
         self.player_speed = 8
         self.fire_rate = 200
         self.can_shoot = True
+        self.fire_timer = None
 
-        self.player_body = self.canvas.create_polygon(
-            self.player_x, self.player_y-25,     # top
-            self.player_x-20, self.player_y+25,  # bottom-left
-            self.player_x+20, self.player_y+25,  # bottom-right
-            fill="#00eaff", outline="#00ffff", width=2
-        )
-
-        self.player_engine = self.canvas.create_oval(
-            self.player_x-10, self.player_y+25,
-            self.player_x+10, self.player_y+42,
-            fill="#0077cc", outline=""
-        )
-
-        # Lists
-        self.bullets = []
-        self.enemies = []
-        self.particles = []
-        self.stars = []
+        # Entities
+        self.bullets = EntityStore()
+        self.enemies = EntityStore()
+        self.particles = ParticleSystem(
+            PARTICLE_CAP, rng=np.random.default_rng(derive_seed(self.seed, "particles")))
+        self.stars = Starfield(self.fx_rng, WIDTH, HEIGHT, 80)
+        self.explosion_particles = 25
+        self.engine_every = 1       # engine particle every n frames, 0 = off
 
         # Game stats
         self.level = 1
@@ -70,205 +155,179 @@ class Game:
 
         # Boss
         self.boss = None
-        self.boss_active = False
-        self.boss_health = 0
+        self.boss_score = BOSS_SCORE
+        self.boss_health = BOSS_HEALTH
 
-        self.game_over_flag = False
+        # Broad phase, rebuilt from bullet boxes every frame
+        self.grid = SpatialHash(64)
 
-        self.create_starfield()
-
-        # Controls
-        self.win.bind("<KeyPress>", self.key_down)
-        self.win.bind("<KeyRelease>", self.key_up)
+        # Level banner
+        self.banner = None
+        self.banner_timer = None
 
-        self.schedule_enemy()
-        self.update()
-        self.win.mainloop()
+        self.game_over = False
+        self.time = 0
+        self.frame = 0
 
-    # ================= CONTROLS ==================
-    def key_down(self, e):
-        if e.keysym in ("Left", "a", "A"): self.move_left = True
-        if e.keysym in ("Right", "d", "D"): self.move_right = True
-        if e.keysym in ("Up", "w", "W"): self.move_up = True
-        if e.keysym in ("Down", "s", "S"): self.move_down = True
-        if e.keysym == "space":
-            self.shooting = True
-            self.try_auto_shoot()
-
-    def key_up(self, e):
-        if e.keysym in ("Left", "a", "A"): self.move_left = False
-        if e.keysym in ("Right", "d", "D"): self.move_right = False
-        if e.keysym in ("Up", "w", "W"): self.move_up = False
-        if e.keysym in ("Down", "s", "S"): self.move_down = False
-        if e.keysym == "space": self.shooting = False
-
-    # ================= SHOOTING ==================
-    def try_auto_shoot(self):
-        if self.shooting and self.can_shoot:
-            self.shoot()
-            self.can_shoot = False
-            self.win.after(self.fire_rate, self.reset_fire)
+        # Every timed event runs on this clock, advanced by step()
+        self.timers = Scheduler()
+        self.spawn_timer = self.timers.after(0, self.schedule_enemy)
 
+    # ================= SPAWNING ==================
     def shoot(self):
-        b = self.canvas.create_rectangle(
-            self.player_x - 3, self.player_y - 40,
-            self.player_x + 3, self.player_y - 15,
-            fill="yellow", outline=""
-        )
-        self.bullets.append(b)
+        self.bullets.add(Bullet(self.player_x, self.player_y - 40))
+
+    def spawn_enemy(self):
+        x = self.rng.randint(40, WIDTH-40)
+        self.enemies.add(Enemy(x, 12))
 
-    def reset_fire(self):
-        self.can_shoot = True
-        if self.shooting:
-            self.try_auto_shoot()
-
-    # ================= STARS ==================
-    def create_starfield(self):
-        for _ in range(80):
-            x = random.randint(0, WIDTH)
-            y = random.randint(0, HEIGHT)
-            size = random.randint(1, 3)
-            s = self.canvas.create_oval(x, y, x+size, y+size, fill="#637dff", outline="")
-            self.stars.append(s)
-
-    def update_stars(self):
-        for s in self.stars:
-            self.canvas.move(s, 0, 2)
-            if self.canvas.coords(s)[1] > HEIGHT:
-                self.canvas.move(s, 0, -HEIGHT)
-
-    # ================= ENEMY SPAWN ==================
     def schedule_enemy(self):
-        if not self.boss_active:
+        if self.boss is None:
             self.spawn_enemy()
-        self.win.after(self.enemy_spawn_rate, self.schedule_enemy)
+        self.spawn_timer = self.timers.after(self.enemy_spawn_rate, self.schedule_enemy)
 
-    def spawn_enemy(self):
-        x = random.randint(40, WIDTH-40)
-        e = self.canvas.create_polygon(
-            x, -15,
-            x-22, 25,
-            x+22, 25,
-            fill="#ff3b3b", outline="#ff7f7f", width=2
-        )
-        self.enemies.append(e)
-
-    # ================= BOSS ==================
     def spawn_boss(self):
-        self.boss_active = True
-        self.boss_health = 25
-
-        self.boss = self.canvas.create_rectangle(
-            200, 40, 400, 140,
-            fill="#8e00ff", outline="#d580ff", width=4
-        )
+        self.boss = Boss(200, 40, 400, 140, self.boss_health)
 
-    # ================= EXPLOSION ==================
     def explode(self, x, y):
-        for _ in range(25):
-            self.particles.append(Particle(self.canvas, x, y, "orange", 6))
+        self.particles.emit(x, y, self.explosion_particles, "orange", 6)
 
-    # ================= MAIN LOOP ==================
-    def update(self):
-        if self.game_over_flag:
+    # ================= STEP ==================
+    def step(self, dt, inputs):
+        """Advance the simulation by dt milliseconds."""
+        if self.game_over:
             return
 
+        prof = self.profiler
+        k = dt / FRAME_MS
+        self.time += dt
+        self.frame += 1
+
+        # TIMERS
+        self.timers.advance(dt)
+        prof.lap("timers")
+
         # MOVE PLAYER
-        if self.move_left: self.player_x -= self.player_speed
-        if self.move_right: self.player_x += self.player_speed
-        if self.move_up: self.player_y -= self.player_speed
-        if self.move_down: self.player_y += self.player_speed
+        self.prev_x = self.player_x
+        self.prev_y = self.player_y
+        speed = self.player_speed * k
+        if inputs.left: self.player_x -= speed
+        if inputs.right: self.player_x += speed
+        if inputs.up: self.player_y -= speed
+        if inputs.down: self.player_y += speed
 
         self.player_x = max(30, min(WIDTH-30, self.player_x))
         self.player_y = max(40, min(HEIGHT-40, self.player_y))
 
-        # PERFECT CENTER CORRECTION 🔥
-        body_coords = self.canvas.coords(self.player_body)
-        cx = (body_coords[0] + body_coords[2] + body_coords[4]) / 3
-        cy = (body_coords[1] + body_coords[3] + body_coords[5]) / 3
-
-        dx = self.player_x - cx
-        dy = self.player_y - cy
-
-        self.canvas.move(self.player_body, dx, dy)
-        self.canvas.move(self.player_engine, dx, dy)
+        # SHOOTING
+        if inputs.shoot and self.can_shoot:
+            self.shoot()
+            self.can_shoot = False
+            self.fire_timer = self.timers.after(self.fire_rate, self.reset_fire)
 
         # ENGINE PARTICLES
-        self.particles.append(Particle(self.canvas, self.player_x, self.player_y + 32, "#00aaff"))
-
-        # BULLETS
-        for b in self.bullets[:]:
-            self.canvas.move(b, 0, -12)
-            if self.canvas.coords(b)[1] < 0:
-                self.canvas.delete(b)
-                self.bullets.remove(b)
+        if self.engine_every and self.frame % self.engine_every == 0:
+            self.particles.emit(self.player_x, self.player_y + 32, 1, "#00aaff", 4)
+        prof.lap("movement")
+
+        # BULLETS (backwards, so swap-removal never skips one)
+        bullets = self.bullets
+        for i in range(len(bullets) - 1, -1, -1):
+            b = bullets.items[i]
+            if not self.move_bullet(b, k):
+                bullets.remove(b.handle)
+        prof.lap("bullets")
 
         # ENEMIES
-        for e in self.enemies[:]:
-            self.canvas.move(e, 0, self.enemy_speed)
-            c = self.canvas.coords(e)
-            ex = (c[0] + c[2] + c[4]) / 3
-            ey = (c[1] + c[3] + c[5]) / 3
+        for e in self.enemies:
+            e.py = e.y
+            e.y += self.enemy_speed * k
 
-            if ey > HEIGHT:
+            if e.y > HEIGHT:
                 self.end_game()
                 return
 
-            for b in self.bullets[:]:
-                bx1, by1, bx2, by2 = self.canvas.coords(b)
-                if (bx1 < ex+25 and bx2 > ex-25 and by1 < ey+25 and by2 > ey-25):
-                    self.explode(ex, ey)
-                    self.canvas.delete(e)
-                    self.canvas.delete(b)
-                    self.enemies.remove(e)
-                    self.bullets.remove(b)
+        grid = self.grid
+        grid.clear()
+        for b in bullets:
+            grid.insert(b, *b.box())
+
+        # a bullet removed on its first hit has a stale handle afterwards,
+        # so it can never be spent twice
+        enemies = self.enemies
+        for i in range(len(enemies) - 1, -1, -1):
+            e = enemies.items[i]
+            ex1, ey1, ex2, ey2 = e.box()
+            for b in grid.query(ex1, ey1, ex2, ey2):
+                if not bullets.alive(b.handle):
+                    continue
+                bx1, by1, bx2, by2 = b.box()
+                if bx1 < ex2 and bx2 > ex1 and by1 < ey2 and by2 > ey1 and mask_hit(e, b):
+                    self.explode(e.x, e.y)
+                    bullets.remove(b.handle)
+                    enemies.remove(e.handle)
                     self.score += 1
+                    break
+        prof.lap("enemies")
 
         # BOSS
-        if self.score == 10 and not self.boss_active:
+        if self.score == self.boss_score and self.boss is None:
             self.spawn_boss()
 
-        if self.boss_active and self.boss:
-            bx1, by1, bx2, by2 = self.canvas.coords(self.boss)
-            self.canvas.move(self.boss, random.choice([-2, -1, 1, 2]), 0)
-
-            # bullet hits boss
-            for b in self.bullets[:]:
-                bx, by = self.canvas.coords(b)[0], self.canvas.coords(b)[1]
-                if bx1 < bx < bx2 and by1 < by < by2:
-                    self.canvas.delete(b)
-                    self.bullets.remove(b)
-                    self.boss_health -= 1
-
-                    if self.boss_health <= 0:
-                        self.explode((bx1+bx2)/2, (by1+by2)/2)
-                        self.canvas.delete(self.boss)
-                        self.boss = None
-                        self.boss_active = False
-                        self.level_up()
-                        self.score += 1
+        if self.boss:
+            self.update_boss(k)
+        prof.lap("boss")
 
         # PARTICLES
-        newp = []
-        for p in self.particles:
-            if p.update(): newp.append(p)
-            else: self.canvas.delete(p.id)
-        self.particles = newp
+        self.particles.update(k)
+        prof.lap("particles")
 
         # STARS
-        self.update_stars()
+        self.stars.update(k)
+        prof.lap("stars")
+
+    def move_bullet(self, b, k):
+        b.py = b.y
+        b.y -= 12 * k
+        return b.y >= 0
+
+    def update_boss(self, k):
+        boss = self.boss
+        bx1, by1, bx2, by2 = boss.box()
+        boss.px = boss.x
+        boss.x += self.rng.choice([-2, -1, 1, 2]) * k
+
+        # bullet hits boss
+        bullets = self.bullets
+        for b in self.grid.query(bx1, by1, bx2, by2):
+            if not bullets.alive(b.handle):
+                continue
+            x1, y1, x2, y2 = b.box()
+            if x1 < bx2 and x2 > bx1 and y1 < by2 and y2 > by1 and mask_hit(boss, b):
+                bullets.remove(b.handle)
+                boss.health -= 1
+
+                if boss.health <= 0:
+                    self.explode((bx1+bx2)/2, (by1+by2)/2)
+                    self.boss = None
+                    self.level_up()
+                    self.score += 1
+                    break
 
-        # SCORE
-        self.canvas.delete("score")
-        self.canvas.create_text(
-            70, 20,
-            text=f"Score: {self.score}",
-            fill="white",
-            font=("Arial", 16),
-            tag="score"
-        )
+    def reset_fire(self):
+        self.can_shoot = True
 
-        self.win.after(16, self.update)
+    def checksum(self):
+        """CRC of the gameplay state (particles and stars excluded)."""
+        boss = self.boss
+        return checksum(
+            self.frame, self.score, self.level, self.game_over,
+            self.player_x, self.player_y, self.timers.now, self.can_shoot,
+            self.timers.remaining(self.spawn_timer),
+            [(b.x, b.y) for b in self.bullets],
+            [(e.x, e.y) for e in self.enemies],
+            (boss.x, boss.y, boss.health) if boss else None,
+        )
 
     # ================= LEVEL ==================
     def level_up(self):
@@ -276,18 +335,344 @@ class Game:
         self.enemy_speed += 1
         self.enemy_spawn_rate = max(400, self.enemy_spawn_rate - 150)
 
-        self.canvas.create_text(
-            WIDTH//2, HEIGHT//2,
-            text=f"LEVEL {self.level}!",
-            fill="#00ff7f",
-            font=("Arial", 36, "bold"),
-            tag="lvl"
-        )
-        self.win.after(1200, lambda: self.canvas.delete("lvl"))
+        self.banner = f"LEVEL {self.level}!"
+        self.timers.cancel(self.banner_timer)
+        self.banner_timer = self.timers.after(1200, self.clear_banner)
+
+    def clear_banner(self):
+        self.banner = None
+
+    # ================= GAME OVER ==================
+    def end_game(self):
+        self.game_over = True
+
+    def snapshot(self):
+        return Snapshot(self)
+
+
+# ================= SNAPSHOT ==================
+# What Game.render() reads from a World, copied so another thread can
+# draw it while the World moves on. Never changed after it is made.
+class Snapshot:
+    def __init__(self, w):
+        self.frame = w.frame
+        self.player_x, self.player_y = w.player_x, w.player_y
+        self.prev_x, self.prev_y = w.prev_x, w.prev_y
+        self.bullets = tuple(copy(b) for b in w.bullets)
+        self.enemies = tuple(copy(e) for e in w.enemies)
+        self.boss = copy(w.boss) if w.boss else None
+        self.particles = w.particles.snapshot()
+        self.stars = w.stars.snapshot()
+        self.score = w.score
+        self.level = w.level
+        self.banner = w.banner
+        self.game_over = w.game_over
+
+
+# ================= SPRITES ==================
+# Each entity is one image item, pre-rendered from these. The image goes
+# at the top-left of the entity's shapes (its mask origin) minus the pad.
+PLAYER_SPRITE = Sprite((
+    ("polygon", (20, 0, 0, 50, 40, 50), "#00eaff", "#00ffff", 2),
+    ("oval", (10, 50, 30, 67), "#0077cc", None, 0),
+), glow=3, glow_color="#00ffff")
+BULLET_SPRITE = Sprite((("rectangle", (0, 0, 6, 25), "yellow", None, 0),))
+ENEMY_SPRITE = Sprite((("polygon", (22, 0, 0, 40, 44, 40), "#ff3b3b", "#ff7f7f", 2),))
+
+
+def boss_sprite(w, h):
+    return Sprite((("rectangle", (0, 0, w, h), "#8e00ff", "#d580ff", 4),))
+
+
+# ================= GAME (VIEW) ==================
+# Draws the World onto a Canvas; holds no game state of its own.
+# With threaded=True the World steps on the Driver's SimThread and
+# render() draws the newest Snapshot it published instead of the live World.
+# Tk is imported only when no window, canvas or image factory is passed.
+class Game:
+    def __init__(self, win=None, canvas=None, seed=None, threaded=False,
+                 images=None, render="canvas", sprite_dir=SPRITE_DIR):
+        if win is None or canvas is None or images is None:
+            import tkinter as tk
+            win = win or tk.Tk()
+            canvas = canvas or tk.Canvas(win, width=WIDTH, height=HEIGHT, bg="#010009")
+            images = images or (lambda w, h: tk.PhotoImage(master=win, width=w, height=h))
+        self.win = win
+        self.win.title("Galaxy Shooter — FIXED VERSION")
+
+        self.canvas = canvas
+        self.canvas.pack()
+        self.renderer = RENDERERS[render](self.canvas, WIDTH, HEIGHT, "#010009", images)
+        self.canvas = self.renderer.surface
+
+        self.profiler = FrameProfiler()
+        self.driver = Driver(self.win, self.step, self.render, FRAME_MS, self.profiler,
+                             threaded)
+        self.loop = self.driver.loop
+        self.world = World(self.driver.world_profiler, seed)
+        self.inputs = Inputs()
+        self.bits = 0       # the inputs the World steps with; sent on every key
+        self.log = InputLog("spaceshoot", self.world.seed, FRAME_MS)
+
+        # (pool, entity handle) -> canvas item; one image item per entity.
+        # Sprites are rendered (or read from disk) when first shown.
+        self.items = {}
+        self.pools = PoolSet(self.canvas)
+        self.sprites = SpriteCache(self.renderer.make_image, disk=sprite_dir)
+        self.banner_item = None
+
+        # particle slot i -> canvas item, grown up to PARTICLE_CAP and reused
+        self.particle_items = []
+        self.particle_colors = []
+        self.particles_shown = 0
+
+        # one canvas tag per star depth; star_offsets is what's drawn so far
+        self.star_items = []
+        self.star_offsets = []
+        self.star_drawn = []     # local star coords drawn, for snapshots
+        for layer in self.world.stars.layers:
+            items = []
+            for x, y in layer.stars:
+                items.append(self.canvas.create_oval(
+                    x, y, x+layer.size, y+layer.size,
+                    fill=layer.color, outline="", tags=layer.tag))
+            self.star_items.append(items)
+            self.star_offsets.append(0)
+            self.star_drawn.append([(x, y) for x, y in layer.stars])
+
+        self.player_image = self.sprites.get(PLAYER_SPRITE)
+        self.player_item = self.canvas.create_image(
+            0, 0, image=self.player_image, anchor="nw")
+
+        # HUD (F2 toggles the fps / entity readout)
+        self.items_created = 0
+        self.hud = Hud(self.canvas)
+        self.hud.add("score", 70, 20, "Score: {}", 0,
+                     fill="white", font=("Arial", 16))
+        self.hud.add("level", 70, 44, "Level: {}", 1,
+                     fill="#00ff7f", font=("Arial", 12))
+        self.hud.add("fps", WIDTH-10, 10, "{} fps", group="stats", visible=False,
+                     anchor="ne", fill="#9CFF9C", font=("Consolas", 10))
+        self.hud.add("entities", WIDTH-10, 26, "{} entities", group="stats", visible=False,
+                     anchor="ne", fill="#9CFF9C", font=("Consolas", 10))
+        self.hud.add("quality", WIDTH-10, 42, "quality {}", group="stats", visible=False,
+                     anchor="ne", fill="#9CFF9C", font=("Consolas", 10))
+
+        # Controls
+        self.win.bind("<KeyPress>", self.key_down)
+        self.win.bind("<KeyRelease>", self.key_up)
+
+        self.overlay = PerfOverlay(self.canvas, self.profiler,
+                                   counts=("n_items", "n_bullets", "n_enemies", "n_particles"))
+
+        # sheds particles and stars when frames run over
+        self.governor = QualityGovernor(QUALITY, self.apply_quality, FRAME_MS,
+                                        name="spaceshoot")
+
+        self.driver.start(self.world)
+
+    def run(self):
+        self.win.mainloop()
+        self.driver.stop()
+
+    # ================= CONTROLS ==================
+    def key_down(self, e):
+        if e.keysym in ("Left", "a", "A"): self.inputs.left = True
+        if e.keysym in ("Right", "d", "D"): self.inputs.right = True
+        if e.keysym in ("Up", "w", "W"): self.inputs.up = True
+        if e.keysym in ("Down", "s", "S"): self.inputs.down = True
+        if e.keysym == "space": self.inputs.shoot = True
+        if e.keysym == "F2": self.hud.toggle("stats")
+        if e.keysym == "F3": self.overlay.toggle()
+        if e.keysym == "F4": self.profiler.export("spaceshoot")
+        if e.keysym == "F5": self.log.save(f"spaceshoot-{self.world.seed}.replay.json")
+        self.driver.send(self.inputs.bits())
+
+    def key_up(self, e):
+        if e.keysym in ("Left", "a", "A"): self.inputs.left = False
+        if e.keysym in ("Right", "d", "D"): self.inputs.right = False
+        if e.keysym in ("Up", "w", "W"): self.inputs.up = False
+        if e.keysym in ("Down", "s", "S"): self.inputs.down = False
+        if e.keysym == "space": self.inputs.shoot = False
+        self.driver.send(self.inputs.bits())
+
+    # ================= DRAWING ==================
+    def sprite_pool(self, sprite):
+        # one pool per sprite: if the cache evicted it and rendered it
+        # again, the pool's items move to the new image
+        image = self.sprites.get(sprite)
+        pool = self.pools.get("image", name=sprite, image=image, anchor="nw")
+        if pool.options["image"] is not image:
+            pool.configure(image=image)
+        return pool
+
+    def sync(self, objs, pool, dx, dy, alpha, alive):
+        # keyed by handle, so a snapshot's copy maps to the same item;
+        # (dx, dy) takes an object's position to its image's corner
+        for o in objs:
+            x = lerp(o.px, o.x, alpha) + dx
+            y = lerp(o.py, o.y, alpha) + dy
+            key = (pool, o.handle)
+            item = self.items.get(key)
+            if item is None:
+                self.items[key] = pool.acquire(x, y)
+            else:
+                self.canvas.coords(item, x, y)
+            alive.add(key)
+
+    def render_particles(self, ps, alpha):
+        n = ps.count
+        items = self.particle_items
+        colors = self.particle_colors
+
+        xs = lerp(ps.px[:n], ps.x[:n], alpha).tolist()
+        ys = lerp(ps.py[:n], ps.y[:n], alpha).tolist()
+        sizes = ps.size[:n].tolist()
+        cols = ps.color[:n].tolist()
+
+        for i in range(n):
+            x, y, size = xs[i], ys[i], sizes[i]
+            color = ps.palette[cols[i]]
+            if i == len(items):
+                items.append(self.canvas.create_oval(
+                    x, y, x+size, y+size, fill=color, outline=""))
+                colors.append(color)
+                continue
+            self.canvas.coords(items[i], x, y, x+size, y+size)
+            if i >= self.particles_shown:
+                self.canvas.itemconfig(items[i], state="normal", fill=color)
+                colors[i] = color
+            elif colors[i] != color:
+                self.canvas.itemconfig(items[i], fill=color)
+                colors[i] = color
+
+        for i in range(n, self.particles_shown):
+            self.canvas.itemconfig(items[i], state="hidden")
+        self.particles_shown = n
+
+    def render_stars(self, stars, alpha):
+        for i, layer in enumerate(stars.layers):
+            offset = lerp(layer.prev_offset, layer.offset, alpha)
+            self.canvas.move(layer.tag, 0, offset - self.star_offsets[i])
+            self.star_offsets[i] = offset
+
+            items, size = self.star_items[i], layer.size
+            if layer.wrapped is None:
+                drawn = self.star_drawn[i]
+                wrapped = [j for j, star in enumerate(layer.stars) if star != drawn[j]]
+            else:
+                wrapped = layer.wrapped
+            for j in wrapped:
+                x, y = layer.stars[j]
+                self.canvas.coords(items[j], x, y+offset, x+size, y+offset+size)
+            if layer.wrapped is None:
+                for j in wrapped:
+                    drawn[j] = layer.stars[j]
+            else:
+                layer.wrapped.clear()
+
+    def apply_quality(self, q):
+        w = self.world
+        w.particles.budget = q["particles"]
+        w.explosion_particles = q["explosion"]
+        w.engine_every = q["engine_every"]
+
+        n = q["stars"]
+        for i, items in enumerate(self.star_items):
+            keep = n // len(self.star_items) + (1 if i < n % len(self.star_items) else 0)
+            for j, item in enumerate(items):
+                self.canvas.itemconfig(item, state="normal" if j < keep else "hidden")
+
+    def render(self, alpha=1.0, view=None):
+        w = self.world if view is None else view
+        prof = self.profiler
+        prof.lap("loop")
+        self.governor.sample(self.loop.work_ms)
+        x = lerp(w.prev_x, w.player_x, alpha)
+        y = lerp(w.prev_y, w.player_y, alpha)
+
+        pad = PLAYER_SPRITE.pad
+        self.canvas.coords(self.player_item, x-20-pad, y-33-pad)
+
+        alive = set()
+        if len(w.bullets):
+            self.sync(w.bullets, self.sprite_pool(BULLET_SPRITE), -3, 0, alpha, alive)
+        if len(w.enemies):
+            pad = ENEMY_SPRITE.pad
+            self.sync(w.enemies, self.sprite_pool(ENEMY_SPRITE), -22-pad, -27-pad,
+                      alpha, alive)
+        if w.boss:
+            sprite = boss_sprite(w.boss.w, w.boss.h)
+            self.sync([w.boss], self.sprite_pool(sprite), -sprite.pad, -sprite.pad,
+                      alpha, alive)
+
+        for key in [key for key in self.items if key not in alive]:
+            key[0].release(self.items.pop(key))
+
+        self.render_particles(w.particles, alpha)
+
+        # new pooled items land above the HUD; lift it back when that happens
+        created = self.pools.stats()["misses"] + len(self.particle_items)
+        if created != self.items_created:
+            self.items_created = created
+            self.hud.lift()
+
+        self.render_stars(w.stars, alpha)
+        prof.lap("render")
+
+        # HUD
+        hud = self.hud
+        hud.set("score", w.score)
+        hud.set("level", w.level)
+        if hud.visible("stats"):
+            hud.set("fps", round(self.loop.fps()))
+            hud.set("entities", len(w.bullets) + len(w.enemies) + w.particles.count)
+            hud.set("quality", self.governor.level)
+        hud.flush()
+
+        # LEVEL BANNER
+        if w.banner and self.banner_item is None:
+            self.banner_item = self.canvas.create_text(
+                WIDTH//2, HEIGHT//2,
+                text=w.banner,
+                fill="#00ff7f",
+                font=("Arial", 36, "bold"),
+                tag="lvl"
+            )
+        elif not w.banner and self.banner_item is not None:
+            self.canvas.delete(self.banner_item)
+            self.banner_item = None
+
+        self.overlay.update()
+        prof.lap("hud")
+
+        self.renderer.present()
+        prof.lap("present")
+
+        if prof.record is not None:
+            # a Tcl round-trip copying every item id: only while it's shown
+            if self.overlay.visible:
+                prof.count("n_items", len(self.canvas.find_all()))
+            prof.count("n_bullets", len(w.bullets))
+            prof.count("n_enemies", len(w.enemies))
+            prof.count("n_particles", w.particles.count)
+
+        if w.game_over and self.loop.running:
+            self.loop.stop()
+            self.end_game()
+
+    # ================= MAIN LOOP ==================
+    def step(self, events):
+        # on the driver's worker thread if threaded: no Tk calls here
+        if self.world.game_over:
+            return
+        if events:
+            self.bits = events[-1]
+        self.world.step(FRAME_MS, Inputs.from_bits(self.bits))
+        self.log.record(self.bits, self.world.checksum())
 
     # ================= GAME OVER ==================
     def end_game(self):
-        self.game_over_flag = True
         self.canvas.create_text(
             WIDTH//2, HEIGHT//2,
             text="GAME OVER",
@@ -296,4 +681,23 @@ class Game:
         )
 
 
-Game()
+# ================= MAIN ==================
+def main(argv=None, startup=None):
+    """Open the window and play; `startup` is the launcher's StartupTimer."""
+    import tkinter as tk
+
+    argv = sys.argv[1:] if argv is None else argv
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+    win = tk.Tk()
+    if startup:
+        startup.mark("window")
+    game = Game(win, threaded="--threaded" in argv,
+                render="image" if "--image" in argv else "canvas")
+    if startup:
+        startup.mark("first frame")     # the loop draws it before returning
+        startup.shown(win)
+    game.run()
+
+
+if __name__ == "__main__":
+    main()
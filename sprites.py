@@ -0,0 +1,244 @@
+"""Pre-rendered sprites: one image per entity instead of a stack of items.
+
+A Sprite describes a small stack of shapes (the layers, bottom first),
+optionally with a soft glow behind them. SpriteCache rasterizes each
+distinct Sprite into RGBA once, with the same masks the compositor
+draws with, and turns it into an image from the renderer's make_image:
+PNG data for Tk photos, raw RGBA for ArrayImages. Images are kept in an
+LRU capped at `max_bytes` of pixels. With `disk` set, rendered sprites
+are also saved there as PNGs and read back on later launches instead
+of being rendered again.
+
+An entity shows its sprite as one image item placed at
+(x - sprite.pad, y - sprite.pad), where (x, y) is the top-left of its
+shapes.
+"""
+import hashlib
+import logging
+import math
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from render import SHAPES, parse_color
+
+log = logging.getLogger("sprites")
+
+VERSION = 1     # bump when rendering changes, to orphan old disk entries
+
+
+class Sprite(NamedTuple):
+    # (kind, coords, fill, outline, width); coords relative to the shapes'
+    # top-left, fill/outline "" or None for none
+    layers: tuple
+    glow: int = 0               # glow radius in pixels, 0 for none
+    glow_color: str = None      # defaults to the first layer's fill
+    opacity: float = 1.0        # scales the whole sprite's alpha
+
+    @property
+    def pad(self):
+        """Pixels around the shapes for outlines and glow."""
+        line = max((-(-width // 2) for _, _, _, outline, width in self.layers if outline),
+                   default=0)
+        return max(line, 2 * self.glow)
+
+    def size(self):
+        pad = self.pad
+        w = max(max(c[0::2]) for _, c, *_ in self.layers)
+        h = max(max(c[1::2]) for _, c, *_ in self.layers)
+        return math.ceil(w) + 2 * pad, math.ceil(h) + 2 * pad
+
+
+# ================= RASTERIZING ==================
+def render_sprite(sprite):
+    """RGBA array of the sprite."""
+    w, h = sprite.size()
+    pad = sprite.pad
+    rgba = np.zeros((h, w, 4), dtype=np.uint8)
+    px = np.arange(w, dtype=float)[None, :] + 0.5 - pad
+    py = np.arange(h, dtype=float)[:, None] + 0.5 - pad
+
+    cover = np.zeros((h, w), dtype=bool)
+    paints = []
+    for kind, coords, fill, outline, width in sprite.layers:
+        shape = SHAPES[kind]
+        if fill:
+            mask = shape(coords, px, py, 0)
+            paints.append((mask, parse_color(fill)))
+            cover |= mask
+        if outline and width:
+            mask = shape(coords, px, py, width / 2) & ~shape(coords, px, py, -width / 2)
+            paints.append((mask, parse_color(outline)))
+            cover |= mask
+
+    if sprite.glow:
+        alpha = blur(cover.astype(float), sprite.glow)
+        alpha = blur(alpha, sprite.glow)
+        rgba[..., :3] = parse_color(sprite.glow_color or sprite.layers[0][2])
+        rgba[..., 3] = np.minimum(255, alpha * 1.5 * 255).astype(np.uint8)
+
+    for mask, color in paints:
+        rgba[mask, :3] = color
+        rgba[mask, 3] = 255
+    if sprite.opacity < 1:
+        rgba[..., 3] = (rgba[..., 3] * sprite.opacity).astype(np.uint8)
+    return rgba
+
+
+def blur(a, r):
+    """Box blur of radius r along both axes."""
+    k = 2 * r + 1
+    for axis in (0, 1):
+        p = np.pad(a, [(r + 1, r) if i == axis else (0, 0) for i in range(2)])
+        c = np.cumsum(p, axis=axis)
+        a = (np.take(c, range(k, c.shape[axis]), axis=axis) -
+             np.take(c, range(0, c.shape[axis] - k), axis=axis)) / k
+    return a
+
+
+# ================= PNG ==================
+def encode_png(rgba):
+    h, w = rgba.shape[:2]
+    rows = np.zeros((h, 1 + w * 4), dtype=np.uint8)    # filter byte 0 per row
+    rows[:, 1:] = rgba.reshape(h, -1)
+
+    def chunk(tag, data):
+        return (struct.pack(">I", len(data)) + tag + data +
+                struct.pack(">I", zlib.crc32(tag + data)))
+
+    return (b"\x89PNG\r\n\x1a\n" +
+            chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)) +
+            chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)) +
+            chunk(b"IEND", b""))
+
+
+def decode_png(data):
+    """RGBA array from a PNG written by encode_png(); ValueError otherwise."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("not a PNG")
+    pos, idat, w = 8, [], None
+    while pos < len(data):
+        n, = struct.unpack(">I", data[pos:pos + 4])
+        tag, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + n]
+        if tag == b"IHDR":
+            w, h, depth, color, _, _, _ = struct.unpack(">IIBBBBB", body)
+            if (depth, color) != (8, 6):
+                raise ValueError("not 8-bit RGBA")
+        elif tag == b"IDAT":
+            idat.append(body)
+        pos += 12 + n
+    if w is None:
+        raise ValueError("no IHDR")
+    rows = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8)
+    rows = rows.reshape(h, 1 + w * 4)
+    if rows[:, 0].any():
+        raise ValueError("filtered rows")
+    return rows[:, 1:].reshape(h, w, 4).copy()
+
+
+# ================= CACHE ==================
+class SpriteCache:
+    """Sprite -> image, least recently used first out past max_bytes."""
+
+    def __init__(self, make_image, max_bytes=8 << 20, disk=None):
+        self.make_image = make_image
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.images = OrderedDict()     # sprite -> (image, bytes)
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def get(self, sprite):
+        entry = self.images.get(sprite)
+        if entry is not None:
+            self.images.move_to_end(sprite)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        image = self.load(sprite)
+        nbytes = image.width() * image.height() * 4
+        self.images[sprite] = (image, nbytes)
+        self.bytes += nbytes
+        # whoever shows an evicted image still holds it, so it stays valid
+        while self.bytes > self.max_bytes and len(self.images) > 1:
+            _, (_, n) = self.images.popitem(last=False)
+            self.bytes -= n
+            self.evictions += 1
+        return image
+
+    def load(self, sprite):
+        w, h = sprite.size()
+        image = self.make_image(w, h)
+        put_rgba = getattr(image, "put_rgba", None)
+
+        png = self.read(sprite)
+        if png is not None:
+            try:
+                rgba = decode_png(png)      # checked before Tk ever sees it
+            except (ValueError, zlib.error) as e:
+                log.warning("ignoring bad cached sprite: %s", e)
+            else:
+                if rgba.shape[:2] == (h, w):
+                    if put_rgba is None:
+                        image.put(png)
+                    else:
+                        put_rgba(rgba)
+                    self.disk_hits += 1
+                    return image
+
+        rgba = render_sprite(sprite)
+        png = encode_png(rgba) if put_rgba is None or self.disk else None
+        if put_rgba is None:
+            image.put(png)
+        else:
+            put_rgba(rgba)
+        self.write(sprite, png)
+        return image
+
+    # ---- disk
+    def path(self, sprite):
+        name = hashlib.sha1(repr((VERSION, sprite)).encode()).hexdigest()[:20]
+        return os.path.join(self.disk, name + ".png")
+
+    def read(self, sprite):
+        if not self.disk:
+            return None
+        try:
+            with open(self.path(sprite), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            log.warning("sprite cache read failed: %s", e)
+            return None
+
+    def write(self, sprite, png):
+        if not self.disk:
+            return
+        path = self.path(sprite)
+        try:
+            os.makedirs(self.disk, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(png)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            log.warning("sprite cache write failed: %s", e)
+
+    def stats(self):
+        return {
+            "sprites": len(self.images),
+            "kb": round(self.bytes / 1024, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+        }
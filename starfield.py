@@ -0,0 +1,89 @@
+from collections import deque
+
+# (speed px/frame, size px, color), far to near
+DEPTHS = (
+    (1.0, 1, "#3d4f9f"),
+    (2.0, 2, "#637dff"),
+    (3.0, 3, "#a3b1ff"),
+)
+
+
+# ================= STARFIELD ==================
+class StarLayer:
+    """Stars sharing one speed, stored in layer-local coordinates.
+
+    A star's screen y is its local y plus the layer's offset, so moving
+    the layer only changes `offset`. Stars never change order within a
+    layer, so `order` (local y, lowest on screen first) tells exactly
+    which stars are due to wrap and update() only touches those. Indices
+    of wrapped stars collect in `wrapped` until the view redraws them.
+    """
+
+    def __init__(self, rng, width, height, count, speed, size, color, tag):
+        self.height = height
+        self.speed = speed
+        self.size = size
+        self.color = color
+        self.tag = tag
+
+        self.offset = 0
+        self.prev_offset = 0
+        self.stars = [[rng.randint(0, width), rng.randint(0, height)]
+                      for _ in range(count)]
+        self.order = deque(sorted(range(count), key=lambda i: -self.stars[i][1]))
+        self.wrapped = set()
+
+    def update(self, k=1):
+        self.prev_offset = self.offset
+        self.offset += self.speed * k
+
+        limit = self.height - self.offset
+        stars, order = self.stars, self.order
+        while order and stars[order[0]][1] > limit:
+            i = order[0]
+            stars[i][1] -= self.height
+            order.rotate(-1)
+            self.wrapped.add(i)
+
+    def snapshot(self):
+        return StarLayerSnapshot(self)
+
+
+class StarLayerSnapshot:
+    """Copy of a StarLayer for another thread to draw.
+
+    `wrapped` can't be handed over: the renderer may skip snapshots, and
+    the wraps in a skipped one would be lost. It is None here, and the
+    renderer compares `stars` against what it drew last instead.
+    """
+
+    def __init__(self, layer):
+        self.speed = layer.speed
+        self.size = layer.size
+        self.color = layer.color
+        self.tag = layer.tag
+        self.offset = layer.offset
+        self.prev_offset = layer.prev_offset
+        self.stars = tuple((x, y) for x, y in layer.stars)
+        self.wrapped = None
+
+
+class Starfield:
+    def __init__(self, rng, width, height, count=80, depths=DEPTHS):
+        self.layers = []
+        for i, (speed, size, color) in enumerate(depths):
+            n = count // len(depths) + (1 if i < count % len(depths) else 0)
+            self.layers.append(StarLayer(rng, width, height, n,
+                                         speed, size, color, f"stars{i}"))
+
+    def update(self, k=1):
+        for layer in self.layers:
+            layer.update(k)
+
+    def snapshot(self):
+        return StarfieldSnapshot(self)
+
+
+class StarfieldSnapshot:
+    def __init__(self, field):
+        self.layers = tuple(layer.snapshot() for layer in field.layers)
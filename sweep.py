@@ -0,0 +1,214 @@
+"""Spaceshoot difficulty sweep: seeded bot runs spread over a process pool.
+
+Each run is a headless World with one difficulty setting, one bot pilot
+and one seed, stepped 16 ms at a time until an enemy gets through or the
+time cap is hit. Runs are independent, so they are handed to a
+ProcessPoolExecutor in chunks and the sweep scales with the number of
+worker processes. Per setting and pilot the table shows time to death,
+kills per second, levels reached and the peak entity counts of any frame;
+runs still alive at the cap count as dying at the cap.
+
+    python sweep.py --runs 40
+    python sweep.py --enemy-speed 2,3,4 --spawn-rate 1200,900 --pilot tracker
+    python sweep.py --boss-health 15,25 --workers 8 --out sweep.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from perf import percentile
+from replay import derive_seed
+
+PARAMS = {
+    # option: (World attribute, default, type)
+    "enemy_speed": ("enemy_speed", 3, float),
+    "spawn_rate": ("enemy_spawn_rate", 1200, int),
+    "fire_rate": ("fire_rate", 200, int),
+    "boss_health": ("boss_health", 25, int),
+    "boss_score": ("boss_score", 10, int),
+}
+
+
+# ================= PILOTS ==================
+# A pilot is made once per run from the run's seed and then called every
+# step with the World; it returns that step's Inputs.
+def idle(seed):
+    from spaceshoot import Inputs
+
+    def pilot(world):
+        return Inputs()
+    return pilot
+
+
+def turret(seed):
+    """Sits where it spawned and holds fire."""
+    from spaceshoot import Inputs
+
+    def pilot(world):
+        inputs = Inputs()
+        inputs.shoot = True
+        return inputs
+    return pilot
+
+
+def wander(seed):
+    """Fires constantly and drifts left or right at random."""
+    from spaceshoot import Inputs
+    rng = random.Random(derive_seed(seed, "pilot"))
+    state = {"dir": 0, "until": 0}
+
+    def pilot(world):
+        if world.frame >= state["until"]:
+            state["dir"] = rng.choice((-1, 0, 1))
+            state["until"] = world.frame + rng.randint(10, 60)
+        inputs = Inputs()
+        inputs.shoot = True
+        inputs.left = state["dir"] < 0
+        inputs.right = state["dir"] > 0
+        return inputs
+    return pilot
+
+
+def tracker(seed):
+    """Lines up under the lowest enemy (or the boss) and fires."""
+    from spaceshoot import Inputs
+
+    def pilot(world):
+        if world.boss is not None:
+            target = world.boss.x + world.boss.w / 2
+        elif len(world.enemies):
+            target = max(world.enemies, key=lambda e: e.y).x
+        else:
+            target = world.player_x
+        inputs = Inputs()
+        inputs.shoot = True
+        dx = target - world.player_x
+        inputs.left = dx < -world.player_speed / 2
+        inputs.right = dx > world.player_speed / 2
+        return inputs
+    return pilot
+
+
+PILOTS = {"idle": idle, "turret": turret, "wander": wander, "tracker": tracker}
+
+
+# ================= RUNS ==================
+def run_one(job):
+    """One seeded episode; returns its stats dict."""
+    import spaceshoot
+
+    settings, pilot_name, seed, max_ms = job
+    world = spaceshoot.World(seed=seed)
+    for name, value in settings.items():
+        setattr(world, PARAMS[name][0], value)
+    # cosmetic only, and on separate random streams: skip it
+    world.explosion_particles = 0
+    world.engine_every = 0
+
+    pilot = PILOTS[pilot_name](seed)
+    step_ms = spaceshoot.FRAME_MS
+    peak_bullets = peak_enemies = 0
+    while not world.game_over and world.time < max_ms:
+        world.step(step_ms, pilot(world))
+        peak_bullets = max(peak_bullets, len(world.bullets))
+        peak_enemies = max(peak_enemies, len(world.enemies) + (world.boss is not None))
+
+    seconds = world.time / 1000
+    return {
+        "died": world.game_over,
+        "seconds": seconds,
+        "score": world.score,
+        "kills_per_s": world.score / seconds if seconds else 0,
+        "level": world.level,
+        "peak_bullets": peak_bullets,
+        "peak_enemies": peak_enemies,
+    }
+
+
+def summarize(runs):
+    secs = [r["seconds"] for r in runs]
+    return {
+        "runs": len(runs),
+        "died": round(sum(r["died"] for r in runs) / len(runs), 3),
+        "ttd_p10": round(percentile(secs, 10), 1),
+        "ttd_p50": round(percentile(secs, 50), 1),
+        "ttd_p90": round(percentile(secs, 90), 1),
+        "kills_s": round(sum(r["kills_per_s"] for r in runs) / len(runs), 2),
+        "level_max": max(r["level"] for r in runs),
+        "peak_bul": max(r["peak_bullets"] for r in runs),
+        "peak_ene": max(r["peak_enemies"] for r in runs),
+    }
+
+
+def sweep(grid, pilots, runs, seed, max_ms, workers=None):
+    """Run every (setting, pilot, seed) in the pool; yield (setting, pilot, summary)."""
+    cells = [(dict(zip(grid, values)), pilot)
+             for values in itertools.product(*grid.values()) for pilot in pilots]
+    jobs = [(settings, pilot, derive_seed(seed, f"run{i}"), max_ms)
+            for settings, pilot in cells for i in range(runs)]
+
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(run_one, jobs, chunksize=chunk))
+
+    for n, (settings, pilot) in enumerate(cells):
+        yield settings, pilot, summarize(results[n * runs:(n + 1) * runs])
+
+
+# ================= CLI ==================
+def values(kind):
+    def parse(text):
+        return [kind(v) for v in text.split(",")]
+    return parse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for name, (_, default, kind) in PARAMS.items():
+        parser.add_argument("--" + name.replace("_", "-"), dest=name,
+                            type=values(kind), default=[default])
+    parser.add_argument("--pilot", type=lambda t: t.split(","), default=["tracker"],
+                        help="comma-separated: " + ", ".join(PILOTS))
+    parser.add_argument("--runs", type=int, default=20, help="seeds per setting")
+    parser.add_argument("--seconds", type=float, default=120, help="run cap")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, help="default: one per core")
+    parser.add_argument("--out", help="append result rows here as JSON lines")
+    args = parser.parse_args(argv)
+
+    for pilot in args.pilot:
+        if pilot not in PILOTS:
+            parser.error(f"unknown pilot {pilot!r}")
+
+    grid = {name: getattr(args, name) for name in PARAMS}
+    cols = (*PARAMS, "pilot", "runs", "died", "ttd_p10", "ttd_p50", "ttd_p90",
+            "kills_s", "level_max", "peak_bul", "peak_ene")
+    print("  ".join(f"{c:>11}" for c in cols))
+
+    t0 = time.perf_counter()
+    rows = []
+    for settings, pilot, summary in sweep(grid, args.pilot, args.runs, args.seed,
+                                          args.seconds * 1000, args.workers):
+        row = {**settings, "pilot": pilot, **summary}
+        rows.append(row)
+        print("  ".join(f"{row[c]:>11}" for c in cols))
+    wall = time.perf_counter() - t0
+    total = sum(r["runs"] for r in rows)
+    print(f"{total} runs in {wall:.1f} s ({total / wall:.1f} runs/s, "
+          f"{args.workers or os.cpu_count()} workers)")
+
+    if args.out:
+        with open(args.out, "a") as f:
+            for row in rows:
+                f.write(json.dumps({**row, "seed": args.seed, "seconds": args.seconds}) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import heapq
+
+
+# ================= SCHEDULER ==================
+class Timer:
+    __slots__ = ("due", "func", "args", "cancelled")
+
+    def __init__(self, due, func, args):
+        self.due = due
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+
+class Scheduler:
+    """Timed callbacks on the game clock instead of Tk's after().
+
+    The clock only moves when advance(dt) is called from the simulation
+    step, so timers stay in lockstep with the game: slow frames delay
+    them exactly as much as they delay everything else, and pause()
+    freezes every timer at once. Timers due in the same advance() fire
+    in due order, ties in scheduling order. While a callback runs, `now`
+    is its due time, so a timer that re-arms itself keeps an exact period
+    however coarse the steps are. Cancelled timers stay in the heap and
+    are skipped when they come up.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.heap = []
+        self.seq = 0
+        self.paused = False
+
+    def __len__(self):
+        return sum(1 for _, _, t in self.heap if not t.cancelled)
+
+    def after(self, delay, func, *args):
+        timer = Timer(self.now + delay, func, args)
+        heapq.heappush(self.heap, (timer.due, self.seq, timer))
+        self.seq += 1
+        return timer
+
+    def cancel(self, timer):
+        if timer is not None:
+            timer.cancelled = True
+
+    def remaining(self, timer):
+        return max(0, timer.due - self.now)
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def clear(self):
+        self.heap.clear()
+
+    def advance(self, dt):
+        if self.paused:
+            return
+        end = self.now + dt
+        heap = self.heap
+        while heap and heap[0][0] <= end:
+            due, _, timer = heapq.heappop(heap)
+            if not timer.cancelled:
+                self.now = due
+                timer.func(*timer.args)
+        self.now = end